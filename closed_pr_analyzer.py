@@ -2,24 +2,77 @@
 
 import os
 import argparse
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone, timedelta
+import threading
+import numpy as np
 import yaml
 from github import Github, Auth
-from typing import Dict, List, Any, Union
-from statistics import mean, stdev
+from typing import Dict, List, Any, Tuple, Union
+from db_manager import DatabaseManager, dumps_json, loads_json
+from github_api import conditional_get, get_requester, iter_graphql_nodes, parse_timestamp
 import sys
 
+# libyaml's C parser when PyYAML was built with it, otherwise the pure-Python one
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+# Keys the config's github section must define
+REQUIRED_GITHUB_FIELDS = frozenset({'org', 'auth_token', 'repos'})
+
+# Repositories analyzed concurrently; kept low to stay clear of GitHub's secondary rate limits
+MAX_WORKERS = 8
+
+# Closed and merged PRs, most recently updated first. Only the latest reopen event
+# is needed: the analysis window ends now, so if any reopen falls inside it, that one does.
+CLOSED_PRS_QUERY = '''
+query($owner: String!, $name: String!, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    pullRequests(states: [CLOSED, MERGED], first: 100, after: $cursor,
+                 orderBy: {field: UPDATED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        number
+        createdAt
+        closedAt
+        author { login }
+        timelineItems(itemTypes: [REOPENED_EVENT], last: 1) {
+          nodes { ... on ReopenedEvent { createdAt } }
+        }
+      }
+    }
+  }
+}
+'''
+
+def _age_stats(ages) -> Tuple[int, float, float]:
+    """Return the count, mean and sample standard deviation of PR ages in one call."""
+    ages = np.asarray(ages, dtype=np.float64)
+    if not ages.size:
+        return 0, 0, 0
+    return ages.size, float(ages.mean()), float(ages.std(ddof=1)) if ages.size > 1 else 0
+
+def _github_timestamp(value: datetime) -> str:
+    """Format a UTC datetime the way GitHub does, so timestamps compare as plain strings."""
+    return value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
 class ClosedPRAnalyzer:
-    def __init__(self, config: Union[str, Dict], days: int = 28, user_login: str = None, debug: bool = False, github_client=None):
+    def __init__(self, config: Union[str, Dict], days: int = 28, user_login: str = None, debug: bool = False, github_client=None,
+                 db: DatabaseManager = None, refresh: bool = False):
         if isinstance(config, str):
             with open(config, 'r') as f:
-                self.config = yaml.safe_load(f)
+                self.config = yaml.load(f, Loader=SafeLoader)
         else:
             self.config = config
         
         self.days = days
         self.user_login = user_login
         self.debug = debug
+        self.refresh = refresh
+        self._print_lock = threading.Lock()
         
         if github_client is None:
             auth = Auth.Token(self.config['github']['auth_token'])
@@ -28,76 +81,122 @@ class ClosedPRAnalyzer:
             self.github = github_client
             
         self.org = self.github.get_organization(self.config['github']['org'])
+        self.db = db if db is not None else DatabaseManager()
 
     def _print_progress(self, message: str):
         """Print a progress message and flush to ensure immediate display."""
-        print(message, end='', flush=True)
+        with self._print_lock:
+            print(message, end='', flush=True)
+
+    def _get_closed_prs(self, repo_name: str, start_date: datetime) -> List[Dict]:
+        """Get closed PRs updated since the start date, reusing the cached listing if nothing changed."""
+        # Any activity on any PR moves it to the top of this listing, so its ETag
+        # only matches while every PR in the repository is unchanged.
+        resource = f"/repos/{self.config['github']['org']}/{repo_name}/pulls?state=all&sort=updated&direction=desc&per_page=1"
+        cached = self.db.get_etag(resource)
+        status, etag = conditional_get(get_requester(self.org), resource, cached[0] if cached else None)
+        if status == 304 and cached:
+            listing = loads_json(cached[1])
+            # The cached listing is complete back to the start date it was fetched for
+            if parse_timestamp(listing['since']) <= start_date:
+                return listing['prs']
+
+        # Page through closed PRs, most recently updated first. GitHub's fixed-width UTC
+        # timestamps sort chronologically, so they are compared without parsing.
+        start = _github_timestamp(start_date)
+        prs = []
+        for pr in iter_graphql_nodes(
+            get_requester(self.org),
+            CLOSED_PRS_QUERY,
+            {'owner': self.config['github']['org'], 'name': repo_name},
+            ('repository', 'pullRequests')
+        ):
+            if pr['closedAt'] < start:
+                break
+            prs.append(pr)
+
+        # After a 304 the cached ETag still describes the repository, so the wider listing
+        # just fetched replaces the cached one rather than being refetched on every run
+        if status == 304 and cached:
+            etag = etag or cached[0]
+        if status in (200, 304) and etag:
+            self.db.save_etag(resource, etag, dumps_json({'since': start_date.isoformat(), 'prs': prs}))
+        return prs
 
     def analyze_repo(self, repo_name: str) -> Dict:
-        """Analyze closed PRs for a repository."""
-        self._print_progress(f"\nAnalyzing {repo_name}... ")
-        
-        repo = self.org.get_repo(repo_name)
-        
+        """Analyze closed PRs for a repository, reusing today's result unless refreshing."""
         # Calculate the date range
         end_date = datetime.now(timezone.utc)
         start_date = end_date - timedelta(days=self.days)
+        today = end_date.strftime('%Y-%m-%d')
         
-        # Get all closed PRs in the date range
-        prs = list(repo.get_pulls(state='closed', sort='updated', direction='desc'))
-        closed_prs = []
-        user_closed_prs = []
-        user_stats = {}  # login -> list of PR ages
+        # Debug output needs the individual PRs, so it always analyzes afresh
+        if not self.refresh and not self.debug:
+            cached = self.db.get_closed_pr_result(repo_name, today, self.days, self.user_login)
+            if cached is not None:
+                self._print_progress(f"{repo_name}: Using today's cached results.\n")
+                return cached
+        
+        self._print_progress(f"Analyzing {repo_name}...\n")
+        
+        prs = self._get_closed_prs(repo_name, start_date)
+        
+        # Parse each timestamp column once as whole arrays; GitHub timestamps are UTC ('Z')
+        closed_at = np.array([pr['closedAt'].rstrip('Z') for pr in prs], dtype='datetime64[s]')
+        created_at = np.array([pr['createdAt'].rstrip('Z') for pr in prs], dtype='datetime64[s]')
+        
+        # Skip PRs that were closed before our start date. The listing is ordered by last
+        # update, so like paging, stop at the first one.
+        too_old = np.flatnonzero(closed_at < np.datetime64(int(start_date.timestamp()), 's'))
+        closed_count = int(too_old[0]) if too_old.size else len(prs)
+        
+        # Calculate how long each PR was open
+        closed_prs = (closed_at[:closed_count] - created_at[:closed_count]).astype(np.int64) / (24 * 3600)
+        is_user_pr = np.zeros(closed_count, dtype=bool)
+        user_stats = defaultdict(list)  # login -> list of PR ages
         reopened_count = 0
+        window_start, window_end = _github_timestamp(start_date), _github_timestamp(end_date)
         
-        if self.debug:
-            print(f"\nDetailed PR Information for {repo_name}:")
-            print("-" * 80)
-            print(f"{'PR #':<6} {'Opened':<20} {'Closed':<20} {'Days Open':<10} {'Author Login':<30}")
-            print("-" * 80)
+        # Debug rows are buffered and written as one block, so concurrent repositories
+        # don't interleave and a large table costs one write instead of one per PR
+        debug_lines = [
+            f"\nDetailed PR Information for {repo_name}:",
+            "-" * 80,
+            f"{'PR #':<6} {'Opened':<20} {'Closed':<20} {'Days Open':<10} {'Author Login':<30}",
+            "-" * 80,
+        ]
         
-        for pr in prs:
-            # Skip PRs that were closed before our start date
-            if pr.closed_at < start_date:
-                break
-                
-            # Calculate how long the PR was open
-            age_days = (pr.closed_at - pr.created_at).total_seconds() / (24 * 3600)
-            closed_prs.append(age_days)
+        for i, age_days in enumerate(closed_prs.tolist()):
+            pr = prs[i]
             
             # Check if PR was reopened during the period
-            try:
-                timeline = pr.get_issue_events()
-                for event in timeline:
-                    if (hasattr(event, 'event') and event.event == 'reopened' and 
-                        event.created_at >= start_date and event.created_at <= end_date):
-                        reopened_count += 1
-                        break  # Only count once per PR
-            except Exception:
-                # If we can't get timeline events, skip reopened count for this PR
-                pass
+            for event in pr['timelineItems']['nodes']:
+                if window_start <= event['createdAt'] <= window_end:
+                    reopened_count += 1
+                    break  # Only count once per PR
             
-            author_login = pr.user.login if pr.user and pr.user.login is not None else 'N/A'
+            author = pr['author']
+            author_login = author['login'] if author and author.get('login') is not None else 'N/A'
             if self.debug:
-                # Handle potential None values
-                pr_number = pr.number if pr.number is not None else 'N/A'
-                created_at = pr.created_at.strftime('%Y-%m-%d %H:%M') if pr.created_at is not None else 'N/A'
-                closed_at = pr.closed_at.strftime('%Y-%m-%d %H:%M') if pr.closed_at is not None else 'N/A'
-                print(f"{pr_number:<6} {created_at:<20} {closed_at:<20} "
-                      f"{age_days:.1f} days    {author_login:<30}")
+                opened = pr['createdAt'][:16].replace('T', ' ')
+                closed = pr['closedAt'][:16].replace('T', ' ')
+                debug_lines.append(f"{pr['number']:<6} {opened:<20} {closed:<20} "
+                                   f"{age_days:.1f} days    {author_login:<30}")
             
             # Per-user stats for all
             if self.user_login == 'all':
-                if author_login not in user_stats:
-                    user_stats[author_login] = []
                 user_stats[author_login].append(age_days)
             # If user login is specified, check if this PR was created by that user
-            elif self.user_login and pr.user and pr.user.login == self.user_login:
-                user_closed_prs.append(age_days)
+            elif self.user_login and author_login == self.user_login:
+                is_user_pr[i] = True
+        
+        user_closed_prs = closed_prs[is_user_pr]
+        if self.debug:
+            self._print_progress('\n'.join(debug_lines) + '\n')
         
-        if not closed_prs:
-            self._print_progress("No closed PRs found in the specified period.\n")
-            return {
+        if not closed_count:
+            self._print_progress(f"{repo_name}: No closed PRs found in the specified period.\n")
+            result = {
                 'repo_name': repo_name,
                 'total_closed': 0,
                 'avg_days_open': 0,
@@ -106,35 +205,50 @@ class ClosedPRAnalyzer:
                 'user_avg_days_open': 0,
                 'user_std_dev_days': 0,
                 'user_stats': {} if self.user_login == 'all' else None,
-                'reopened_count': 0
+                'reopened_count': 0,
+                'ages': [],
+                'user_ages': []
             }
+            self.db.save_closed_pr_result(repo_name, today, self.days, self.user_login, result)
+            return result
         
-        self._print_progress(f"Found {len(closed_prs)} closed PRs.\n")
+        self._print_progress(f"{repo_name}: Found {closed_count} closed PRs.\n")
         
+        total_closed, avg_days_open, std_dev_days = _age_stats(closed_prs)
+        user_total_closed, user_avg_days_open, user_std_dev_days = _age_stats(user_closed_prs)
         result = {
             'repo_name': repo_name,
-            'total_closed': len(closed_prs),
-            'avg_days_open': mean(closed_prs),
-            'std_dev_days': stdev(closed_prs) if len(closed_prs) > 1 else 0,
-            'user_total_closed': len(user_closed_prs),
-            'user_avg_days_open': mean(user_closed_prs) if user_closed_prs else 0,
-            'user_std_dev_days': stdev(user_closed_prs) if len(user_closed_prs) > 1 else 0,
-            'user_stats': user_stats if self.user_login == 'all' else None,
-            'reopened_count': reopened_count
+            'total_closed': total_closed,
+            'avg_days_open': avg_days_open,
+            'std_dev_days': std_dev_days,
+            'user_total_closed': user_total_closed,
+            'user_avg_days_open': user_avg_days_open,
+            'user_std_dev_days': user_std_dev_days,
+            'user_stats': dict(user_stats) if self.user_login == 'all' else None,
+            'reopened_count': reopened_count,
+            'ages': closed_prs.tolist(),  # Individual PR durations, for overall statistics
+            'user_ages': user_closed_prs.tolist()
         }
         
+        self.db.save_closed_pr_result(repo_name, today, self.days, self.user_login, result)
         return result
 
     def generate_report(self) -> Dict[str, Dict]:
         """Generate a report for all repositories."""
-        report = {}
-        total_repos = len(self.config['github']['repos'])
+        repos = self.config['github']['repos']
+        self._print_progress(f"\nProcessing {len(repos)} repositories...\n")
         
-        for i, repo_name in enumerate(self.config['github']['repos'], 1):
-            self._print_progress(f"\nProcessing repository {i}/{total_repos}: ")
-            report[repo_name] = self.analyze_repo(repo_name)
+        # Repositories are independent and mostly wait on GitHub, so analyze them
+        # concurrently. PyGithub's GithubRetry retries HTTP rate limit responses, and
+        # github_api's shared limiter waits out a spent quota.
+        results = {}
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            futures = {executor.submit(self.analyze_repo, repo_name): repo_name for repo_name in repos}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
             
-        return report
+        # Keep the report in config order
+        return {repo_name: results[repo_name] for repo_name in repos}
 
     def print_report(self, report: Dict[str, Dict], days: int, user_login: str = None, debug: bool = False):
         """Print the analysis report."""
@@ -150,7 +264,7 @@ class ClosedPRAnalyzer:
             all_days = []  # Will store individual PR durations
             user_total_closed = 0
             user_all_days = []
-            overall_user_stats = {}  # For all
+            overall_user_stats = defaultdict(list)  # For all
             total_reopened = 0
             
             for repo_name, stats in report.items():
@@ -166,12 +280,9 @@ class ClosedPRAnalyzer:
                     print(f"{'User':<25} {'Closed PRs':<12} {'Avg Days Open':<15} {'Std Dev':<10}")
                     print("-" * 65)
                     for user, ages in sorted(stats['user_stats'].items()):
-                        avg = mean(ages)
-                        std = stdev(ages) if len(ages) > 1 else 0
-                        print(f"{user:<25} {len(ages):<12} {avg:<15.2f} {std:<10.2f}")
+                        count, avg, std = _age_stats(ages)
+                        print(f"{user:<25} {count:<12} {avg:<15.2f} {std:<10.2f}")
                         # Aggregate for overall
-                        if user not in overall_user_stats:
-                            overall_user_stats[user] = []
                         overall_user_stats[user].extend(ages)
                 elif user_login:
                     print(f"\nStatistics for {user_login}:")
@@ -181,20 +292,10 @@ class ClosedPRAnalyzer:
                         print(f"Standard Deviation: {stats['user_std_dev_days']:.1f}")
                 
                 total_closed += stats['total_closed']
-                # Get the actual PR durations from the repository
-                repo = self.org.get_repo(repo_name)
-                end_date = datetime.now(timezone.utc)
-                start_date = end_date - timedelta(days=days)
-                prs = list(repo.get_pulls(state='closed', sort='updated', direction='desc'))
-                for pr in prs:
-                    if pr.closed_at < start_date:
-                        break
-                    age_days = (pr.closed_at - pr.created_at).total_seconds() / (24 * 3600)
-                    all_days.append(age_days)
+                all_days.extend(stats['ages'])
                 
                 user_total_closed += stats['user_total_closed']
-                if stats['user_total_closed'] > 0:
-                    user_all_days.extend([stats['user_avg_days_open']] * stats['user_total_closed'])
+                user_all_days.extend(stats['user_ages'])
                 
                 total_reopened += stats['reopened_count']
             
@@ -203,23 +304,24 @@ class ClosedPRAnalyzer:
             print(f"Total Closed PRs: {total_closed}")
             print(f"Total Reopened PRs: {total_reopened}")
             if all_days:
-                print(f"Overall Average Days Open: {mean(all_days):.1f}")
-                print(f"Overall Standard Deviation: {stdev(all_days):.1f}")
+                _, avg, std = _age_stats(all_days)
+                print(f"Overall Average Days Open: {avg:.1f}")
+                print(f"Overall Standard Deviation: {std:.1f}")
             
             if user_login == 'all' and overall_user_stats:
                 print("\nOverall per-user statistics:")
                 print(f"{'User':<25} {'Closed PRs':<12} {'Avg Days Open':<15} {'Std Dev':<10}")
                 print("-" * 65)
                 for user, ages in sorted(overall_user_stats.items()):
-                    avg = mean(ages)
-                    std = stdev(ages) if len(ages) > 1 else 0
-                    print(f"{user:<25} {len(ages):<12} {avg:<15.2f} {std:<10.2f}")
+                    count, avg, std = _age_stats(ages)
+                    print(f"{user:<25} {count:<12} {avg:<15.2f} {std:<10.2f}")
             elif user_login:
                 print(f"\nOverall Statistics for {user_login}")
                 print(f"Total Closed PRs: {user_total_closed}")
                 if user_all_days:
-                    print(f"Average Days Open: {mean(user_all_days):.1f}")
-                    print(f"Standard Deviation: {stdev(user_all_days):.1f}")
+                    _, avg, std = _age_stats(user_all_days)
+                    print(f"Average Days Open: {avg:.1f}")
+                    print(f"Standard Deviation: {std:.1f}")
 
 def main():
     parser = argparse.ArgumentParser(
@@ -266,6 +368,11 @@ Examples:
         action='store_true',
         help='Show detailed PR information'
     )
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help="Re-fetch from GitHub instead of using today's cached results"
+    )
     args = parser.parse_args()
 
     if args.days < 1:
@@ -278,7 +385,7 @@ Examples:
 
     try:
         with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
+            config = yaml.load(f, Loader=SafeLoader)
     except yaml.YAMLError as e:
         print("Error: Invalid YAML format in config file.")
         print(f"\nYAML Error details: {e}")
@@ -293,8 +400,7 @@ Examples:
             raise KeyError("Missing 'github' section")
         
         github_config = config['github']
-        required_fields = ['org', 'auth_token', 'repos']
-        missing_fields = [field for field in required_fields if field not in github_config]
+        missing_fields = sorted(REQUIRED_GITHUB_FIELDS - github_config.keys())
         if missing_fields:
             raise KeyError(f"Missing required fields: {', '.join(missing_fields)}")
         
@@ -304,7 +410,7 @@ Examples:
         if not github_config['repos']:
             raise ValueError("'repos' list cannot be empty")
 
-        analyzer = ClosedPRAnalyzer(config, days=args.days, user_login=args.user, debug=args.debug)
+        analyzer = ClosedPRAnalyzer(config, days=args.days, user_login=args.user, debug=args.debug, refresh=args.refresh)
         report = analyzer.generate_report()
         analyzer.print_report(report, args.days, args.user, args.debug)
 
@@ -1,9 +1,33 @@
+import contextlib
+import json
 import sqlite3
+import threading
 from datetime import datetime, timezone
-from typing import Dict, List, Optional
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass, fields
 
-@dataclass
+# orjson parses the large cached PR payloads several times faster when it is installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def dumps_json(value) -> str:
+    """Serialize a cached payload to JSON text."""
+    if orjson is not None:
+        return orjson.dumps(value).decode()
+    return json.dumps(value)
+
+def loads_json(text: str):
+    """Parse a cached JSON payload."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+# Bump when the schema changes so existing databases are migrated on next open
+SCHEMA_VERSION = 3
+
+@dataclass(slots=True, frozen=True)
 class PRStats:
     total_prs: int
     avg_age_days: float
@@ -16,41 +40,173 @@ class PRStats:
     prs_with_zero_comments: int
     reopened_prs: int
 
+# Stored columns, in PRStats field order; the SQL below is built from them once
+STATS_FIELDS = tuple(field.name for field in fields(PRStats))
+
+# Statements are module constants so the connection's statement cache reuses their
+# prepared form instead of re-parsing them on every call
+# An upsert updates an existing day's row in place rather than deleting and reinserting it
+_SQL_INSERT = (
+    f"INSERT INTO pr_stats (repo_name, date, {', '.join(STATS_FIELDS)}) "
+    f"VALUES (?, ?, {', '.join('?' * len(STATS_FIELDS))}) "
+    f"ON CONFLICT (repo_name, date) DO UPDATE SET "
+    f"{', '.join(f'{name} = excluded.{name}' for name in STATS_FIELDS)}"
+)
+# Keyed and clustered by (repo_name, date): with no rowid, the table itself is the index
+# that every stats query seeks through
+_SQL_CREATE_STATS = '''
+    CREATE TABLE IF NOT EXISTS {table} (
+        repo_name TEXT,
+        date TEXT,
+        total_prs INTEGER,
+        avg_age_days REAL,
+        avg_age_days_excluding_oldest REAL,
+        avg_comments REAL,
+        avg_comments_with_comments REAL,
+        approved_prs INTEGER,
+        oldest_pr_age INTEGER,
+        oldest_pr_title TEXT,
+        prs_with_zero_comments INTEGER,
+        reopened_prs INTEGER,
+        PRIMARY KEY (repo_name, date)
+    ) WITHOUT ROWID
+'''
+# Keys of a stats dict, in the order the stats queries select their columns
+_STATS_KEYS = ('repo_name', 'date') + STATS_FIELDS
+_SQL_SELECT = f"SELECT {', '.join(_STATS_KEYS)} FROM pr_stats"
+_SQL_LATEST = f"{_SQL_SELECT} WHERE repo_name = ? ORDER BY date DESC LIMIT 1"
+_SQL_BEFORE = f"{_SQL_SELECT} WHERE repo_name = ? AND date < ? ORDER BY date DESC LIMIT 1"
+_SQL_EARLIEST = f"{_SQL_SELECT} WHERE repo_name = ? ORDER BY date ASC LIMIT 1"
+_SQL_RANGE = f"{_SQL_SELECT} WHERE repo_name = ? AND date BETWEEN ? AND ? ORDER BY date ASC"
+_SQL_FOR_DATE = f"{_SQL_SELECT} WHERE repo_name = ? AND date = ?"
+# The (repo_name, date) primary key holds one row per day, so no per-day aggregation is needed
+_SQL_DAILY_COUNTS = "SELECT date, total_prs FROM pr_stats WHERE repo_name = ? AND date BETWEEN ? AND ? ORDER BY date ASC"
+# SQLite takes a grouped query's bare columns from the row holding the MAX(date) or
+# MIN(date), so these return one row per repository; the trailing aggregate is ignored
+_SQL_LATEST_MANY = (
+    f"SELECT {', '.join(_STATS_KEYS)}, MAX(date) FROM pr_stats "
+    f"WHERE repo_name IN ({{placeholders}}) GROUP BY repo_name"
+)
+_SQL_BEFORE_MANY = (
+    f"SELECT {', '.join(_STATS_KEYS)}, MAX(date) FROM pr_stats "
+    f"WHERE repo_name IN ({{placeholders}}) AND date < ? GROUP BY repo_name"
+)
+_SQL_EARLIEST_MANY = (
+    f"SELECT {', '.join(_STATS_KEYS)}, MIN(date) FROM pr_stats "
+    f"WHERE repo_name IN ({{placeholders}}) GROUP BY repo_name"
+)
+
 class DatabaseManager:
     def __init__(self, db_path: str = 'pr_stats.db'):
         """Initialize the database manager."""
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
-        self.conn.row_factory = sqlite3.Row
-        self._create_tables()
-        self._migrate_schema()
+        # Each thread gets its own connection, keeping its page cache warm and letting
+        # WAL readers run alongside a writer. Writes are still serialized by the lock.
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._shared_conn = None
+        self._read_lock = contextlib.nullcontext()
+        if db_path == ':memory:':
+            # An in-memory database only exists on the connection that created it,
+            # so every thread shares that one and takes turns using it
+            self._shared_conn = self._connect()
+            self._read_lock = self._lock
+        self._init_schema()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """This thread's database connection, opened on first use."""
+        if self._shared_conn is not None:
+            return self._shared_conn
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open and tune a new connection to the database."""
+        # Not bound to its thread, so close() can close every thread's connection
+        # Autocommit: reads never open a transaction, and writes begin their own explicitly
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256, isolation_level=None)
+        self._configure_connection(conn)
+        self._connections.append(conn)
+        return conn
+
+    def close(self):
+        """Close every thread's connection, checkpointing the WAL into the database file."""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
 
     def __del__(self):
-        """Close the database connection when the object is destroyed."""
-        if hasattr(self, 'conn'):
-            self.conn.close()
+        """Close the database connections when the object is destroyed."""
+        for conn in getattr(self, '_connections', []):
+            conn.close()
+
+    def _configure_connection(self, conn: sqlite3.Connection):
+        """Tune a connection for many small writes."""
+        cursor = conn.cursor()
+        # WAL with NORMAL sync avoids an fsync per commit while staying crash-safe, and
+        # lets readers proceed during a write. In-memory databases have no journal file.
+        if self.db_path != ':memory:':
+            cursor.execute("PRAGMA journal_mode=WAL")
+            mode = cursor.fetchone()[0]
+            if mode.lower() != 'wal':
+                print(f"Warning: could not enable WAL mode for {self.db_path}, using {mode}")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA cache_size=-64000")  # 64 MB
+
+    def _init_schema(self):
+        """Create and migrate the schema in one transaction, unless it is already current."""
+        cursor = self.conn.cursor()
+        cursor.execute("PRAGMA user_version")
+        if cursor.fetchone()[0] == SCHEMA_VERSION:
+            return
+        
+        with self.conn:
+            cursor.execute("BEGIN")
+            self._create_tables()
+            self._migrate_schema()
+            self._rebuild_without_rowid()
+            cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
 
     def _create_tables(self):
         """Create the necessary database tables if they don't exist."""
         cursor = self.conn.cursor()
+        cursor.execute(_SQL_CREATE_STATS.format(table='pr_stats'))
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS etags (
+                resource TEXT PRIMARY KEY,
+                etag TEXT,
+                payload TEXT
+            )
+        ''')
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS pr_stats (
+            CREATE TABLE IF NOT EXISTS closed_pr_cache (
                 repo_name TEXT,
                 date TEXT,
-                total_prs INTEGER,
-                avg_age_days REAL,
-                avg_age_days_excluding_oldest REAL,
-                avg_comments REAL,
-                avg_comments_with_comments REAL,
-                approved_prs INTEGER,
-                oldest_pr_age INTEGER,
-                oldest_pr_title TEXT,
-                prs_with_zero_comments INTEGER,
-                reopened_prs INTEGER,
-                PRIMARY KEY (repo_name, date)
+                days INTEGER,
+                user_login TEXT,
+                result TEXT,
+                PRIMARY KEY (repo_name, date, days, user_login)
             )
         ''')
-        self.conn.commit()
+
+    def _rebuild_without_rowid(self):
+        """Copy a pr_stats table created with a rowid into the WITHOUT ROWID layout."""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'pr_stats'")
+        if 'WITHOUT ROWID' in cursor.fetchone()[0].upper():
+            return
+        
+        # Dropping the old table also drops its indexes, which the new layout makes redundant
+        columns = ', '.join(('repo_name', 'date') + STATS_FIELDS)
+        cursor.execute(_SQL_CREATE_STATS.format(table='pr_stats_new'))
+        cursor.execute(f"INSERT INTO pr_stats_new ({columns}) SELECT {columns} FROM pr_stats")
+        cursor.execute("DROP TABLE pr_stats")
+        cursor.execute("ALTER TABLE pr_stats_new RENAME TO pr_stats")
 
     def _migrate_schema(self):
         """Migrate the database schema if needed."""
@@ -73,186 +229,118 @@ class DatabaseManager:
             cursor.execute('ALTER TABLE pr_stats ADD COLUMN prs_with_zero_comments INTEGER DEFAULT 0')
         if 'reopened_prs' not in columns:
             cursor.execute('ALTER TABLE pr_stats ADD COLUMN reopened_prs INTEGER DEFAULT 0')
-        
-        self.conn.commit()
 
     def save_stats(self, repo_name: str, stats: PRStats, date: str = None) -> None:
         """Save PR statistics to the database."""
+        self.save_stats_many([(repo_name, stats)], date)
+
+    def save_stats_many(self, rows: List[Tuple[str, PRStats]], date: str = None) -> None:
+        """Save PR statistics for several repositories in a single transaction."""
         if date is None:
             date = datetime.now(timezone.utc).strftime('%Y-%m-%d')
-            
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            INSERT OR REPLACE INTO pr_stats (
-                repo_name, date, total_prs, avg_age_days, 
-                avg_age_days_excluding_oldest, avg_comments, 
-                avg_comments_with_comments, approved_prs, 
-                oldest_pr_age, oldest_pr_title, prs_with_zero_comments, reopened_prs
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            repo_name, date, stats.total_prs, stats.avg_age_days,
-            stats.avg_age_days_excluding_oldest, stats.avg_comments,
-            stats.avg_comments_with_comments, stats.approved_prs,
-            stats.oldest_pr_age, stats.oldest_pr_title, stats.prs_with_zero_comments, stats.reopened_prs
-        ))
-        self.conn.commit()
+        
+        # Not astuple: PRReporter's stats also carry verbose-only lists that are not stored
+        values = [
+            (repo_name, date, *(getattr(stats, name) for name in STATS_FIELDS))
+            for repo_name, stats in rows
+        ]
+        with self._lock, self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.executemany(_SQL_INSERT, values)
+
+    def get_etag(self, resource: str) -> Optional[Tuple[str, str]]:
+        """Get the cached ETag and payload for a GitHub API resource."""
+        with self._read_lock:
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT etag, payload FROM etags WHERE resource = ?", (resource,))
+            row = cursor.fetchone()
+            if not row:
+                return None
+            return row[0], row[1]
+
+    def save_etag(self, resource: str, etag: str, payload: str) -> None:
+        """Save the ETag and payload for a GitHub API resource."""
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute(
+                "INSERT OR REPLACE INTO etags (resource, etag, payload) VALUES (?, ?, ?)",
+                (resource, etag, payload)
+            )
+
+    def get_closed_pr_result(self, repo_name: str, date: str, days: int, user_login: Optional[str]) -> Optional[Dict]:
+        """Get a cached closed PR analysis result for a repository and date."""
+        with self._read_lock:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                SELECT result FROM closed_pr_cache
+                WHERE repo_name = ? AND date = ? AND days = ? AND user_login = ?
+            """, (repo_name, date, days, user_login or ''))
+            row = cursor.fetchone()
+            return loads_json(row[0]) if row else None
+
+    def save_closed_pr_result(self, repo_name: str, date: str, days: int, user_login: Optional[str], result: Dict) -> None:
+        """Save a closed PR analysis result, including the individual PR ages."""
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                INSERT OR REPLACE INTO closed_pr_cache (repo_name, date, days, user_login, result)
+                VALUES (?, ?, ?, ?, ?)
+            """, (repo_name, date, days, user_login or '', dumps_json(result)))
+
+    def _fetch_one(self, sql: str, params: Tuple) -> Optional[Dict]:
+        """Run a stats query and return its first row as a dict."""
+        with self._read_lock:
+            row = self.conn.execute(sql, params).fetchone()
+        return dict(zip(_STATS_KEYS, row)) if row else None
 
     def get_latest_stats(self, repo_name: str) -> Optional[Dict]:
         """Get the latest statistics for a repository."""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT repo_name, date, total_prs, avg_age_days, 
-                   avg_age_days_excluding_oldest, avg_comments, 
-                   avg_comments_with_comments, approved_prs, 
-                   oldest_pr_age, oldest_pr_title, prs_with_zero_comments, reopened_prs
-            FROM pr_stats 
-            WHERE repo_name = ? 
-            ORDER BY date DESC 
-            LIMIT 1
-        """, (repo_name,))
-        
-        row = cursor.fetchone()
-        if not row:
-            return None
-            
-        return {
-            'date': row[1],
-            'total_prs': float(row[2]),
-            'avg_age_days': float(row[3]),
-            'avg_age_days_excluding_oldest': float(row[4]),
-            'avg_comments': float(row[5]),
-            'avg_comments_with_comments': float(row[6]),
-            'approved_prs': float(row[7]),
-            'oldest_pr_age': float(row[8]),
-            'oldest_pr_title': row[9],
-            'prs_with_zero_comments': float(row[10]),
-            'reopened_prs': float(row[11]) if len(row) > 11 else 0
-        }
+        return self._fetch_one(_SQL_LATEST, (repo_name,))
+
+    def get_latest_stats_many(self, repo_names: List[str]) -> Dict[str, Dict]:
+        """Get the latest statistics for several repositories in one query.
+
+        Repositories without any stats are left out of the result.
+        """
+        return self._fetch_per_repo(_SQL_LATEST_MANY, repo_names)
+
+    def _fetch_per_repo(self, sql: str, repo_names: List[str], params: Tuple = ()) -> Dict[str, Dict]:
+        """Run a grouped stats query for several repositories, keyed by repository name."""
+        if not repo_names:
+            return {}
+        sql = sql.format(placeholders=', '.join('?' * len(repo_names)))
+        with self._read_lock:
+            return {row[0]: dict(zip(_STATS_KEYS, row)) for row in self.conn.execute(sql, (*repo_names, *params))}
 
     def get_stats_before_date(self, repo_name: str, target_date: datetime) -> Optional[Dict]:
         """Get the most recent stats before the target date."""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT repo_name, date, total_prs, avg_age_days, 
-                   avg_age_days_excluding_oldest, avg_comments, 
-                   avg_comments_with_comments, approved_prs, 
-                   oldest_pr_age, oldest_pr_title, prs_with_zero_comments, reopened_prs
-            FROM pr_stats
-            WHERE repo_name = ? AND date < ?
-            ORDER BY date DESC
-            LIMIT 1
-        """, (repo_name, target_date.strftime('%Y-%m-%d')))
-        
-        row = cursor.fetchone()
-        if not row:
-            return None
-            
-        return {
-            'date': row[1],
-            'total_prs': float(row[2]),
-            'avg_age_days': float(row[3]),
-            'avg_age_days_excluding_oldest': float(row[4]),
-            'avg_comments': float(row[5]),
-            'avg_comments_with_comments': float(row[6]),
-            'approved_prs': float(row[7]),
-            'oldest_pr_age': float(row[8]),
-            'oldest_pr_title': row[9],
-            'prs_with_zero_comments': float(row[10]),
-            'reopened_prs': float(row[11]) if len(row) > 11 else 0
-        }
+        return self._fetch_one(_SQL_BEFORE, (repo_name, target_date.strftime('%Y-%m-%d')))
 
     def get_earliest_stats(self, repo_name: str) -> Optional[Dict]:
         """Get the earliest stats for a repository."""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT repo_name, date, total_prs, avg_age_days, 
-                   avg_age_days_excluding_oldest, avg_comments, 
-                   avg_comments_with_comments, approved_prs, 
-                   oldest_pr_age, oldest_pr_title, prs_with_zero_comments, reopened_prs
-            FROM pr_stats
-            WHERE repo_name = ?
-            ORDER BY date ASC
-            LIMIT 1
-        """, (repo_name,))
-        
-        row = cursor.fetchone()
-        if not row:
-            return None
-            
-        return {
-            'date': row[1],
-            'total_prs': float(row[2]),
-            'avg_age_days': float(row[3]),
-            'avg_age_days_excluding_oldest': float(row[4]),
-            'avg_comments': float(row[5]),
-            'avg_comments_with_comments': float(row[6]),
-            'approved_prs': float(row[7]),
-            'oldest_pr_age': float(row[8]),
-            'oldest_pr_title': row[9],
-            'prs_with_zero_comments': float(row[10]),
-            'reopened_prs': float(row[11]) if len(row) > 11 else 0
-        }
+        return self._fetch_one(_SQL_EARLIEST, (repo_name,))
+
+    def get_stats_before_date_many(self, repo_names: List[str], target_date: datetime) -> Dict[str, Dict]:
+        """Get each repository's most recent stats before the target date in one query."""
+        return self._fetch_per_repo(_SQL_BEFORE_MANY, repo_names, (target_date.strftime('%Y-%m-%d'),))
+
+    def get_earliest_stats_many(self, repo_names: List[str]) -> Dict[str, Dict]:
+        """Get each repository's earliest stats in one query."""
+        return self._fetch_per_repo(_SQL_EARLIEST_MANY, repo_names)
 
     def get_stats_in_date_range(self, repo_name: str, start_date: datetime, end_date: datetime) -> List[Dict]:
         """Get all stats for a repository within a date range."""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT repo_name, date, total_prs, avg_age_days, 
-                   avg_age_days_excluding_oldest, avg_comments, 
-                   avg_comments_with_comments, approved_prs, 
-                   oldest_pr_age, oldest_pr_title, prs_with_zero_comments, reopened_prs
-            FROM pr_stats 
-            WHERE repo_name = ? 
-            AND date BETWEEN ? AND ?
-            ORDER BY date ASC
-        """, (repo_name, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')))
-        
-        rows = cursor.fetchall()
-        stats_list = []
-        for row in rows:
-            stats = {
-                'date': row[1],
-                'total_prs': float(row[2]),
-                'avg_age_days': float(row[3]),
-                'avg_age_days_excluding_oldest': float(row[4]),
-                'avg_comments': float(row[5]),
-                'avg_comments_with_comments': float(row[6]),
-                'approved_prs': float(row[7]),
-                'oldest_pr_age': float(row[8]),
-                'oldest_pr_title': row[9],
-                'prs_with_zero_comments': float(row[10]),
-                'reopened_prs': float(row[11]) if len(row) > 11 else 0
-            }
-            stats_list.append(stats)
-        return stats_list
+        params = (repo_name, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
+        with self._read_lock:
+            # Build the dicts straight from the cursor's plain tuples instead of materializing the rows first
+            return [dict(zip(_STATS_KEYS, row)) for row in self.conn.execute(_SQL_RANGE, params)]
+
+    def get_daily_pr_counts(self, repo_name: str, start_date: datetime, end_date: datetime) -> List[Tuple[str, int]]:
+        """Get (date, total_prs) pairs for a repository within a date range, for graphing."""
+        params = (repo_name, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
+        with self._read_lock:
+            return self.conn.execute(_SQL_DAILY_COUNTS, params).fetchall()
 
     def get_stats_for_date(self, repo_name: str, date: str) -> Optional[Dict]:
         """Get stats for a specific repository and date."""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT repo_name, date, total_prs, avg_age_days, 
-                   avg_age_days_excluding_oldest, avg_comments, 
-                   avg_comments_with_comments, approved_prs, 
-                   oldest_pr_age, oldest_pr_title, prs_with_zero_comments, reopened_prs
-            FROM pr_stats 
-            WHERE repo_name = ? 
-            AND date = ?
-        """, (repo_name, date))
-        
-        row = cursor.fetchone()
-        if not row:
-            return None
-            
-        return {
-            'date': row[1],
-            'total_prs': float(row[2]),
-            'avg_age_days': float(row[3]),
-            'avg_age_days_excluding_oldest': float(row[4]),
-            'avg_comments': float(row[5]),
-            'avg_comments_with_comments': float(row[6]),
-            'approved_prs': float(row[7]),
-            'oldest_pr_age': float(row[8]),
-            'oldest_pr_title': row[9],
-            'prs_with_zero_comments': float(row[10]),
-            'reopened_prs': float(row[11]) if len(row) > 11 else 0
-        } 
\ No newline at end of file
+        return self._fetch_one(_SQL_FOR_DATE, (repo_name, date))
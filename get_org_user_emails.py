@@ -1,11 +1,36 @@
 #!/usr/bin/env python3
 
 import argparse
+import itertools
 import os
 import sys
 import yaml
 from github import Github, Auth
 from github.GithubException import UnknownObjectException, BadCredentialsException
+from github_api import get_requester, graphql_query, iter_graphql_nodes
+
+# libyaml's C parser when PyYAML was built with it, otherwise the pure-Python one
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+# Keys the config's github section must define
+REQUIRED_GITHUB_FIELDS = frozenset({'org', 'auth_token'})
+
+# Logins and public emails of organization members, 100 per request, with the total
+# so the count can be reported from the first page
+MEMBERS_QUERY = '''
+query($org: String!, $cursor: String) {
+  organization(login: $org) {
+    membersWithRole(first: 100, after: $cursor) {
+      totalCount
+      pageInfo { hasNextPage endCursor }
+      nodes { login email }
+    }
+  }
+}
+'''
 
 def get_org_user_emails(config_path: str):
     """
@@ -13,7 +38,7 @@ def get_org_user_emails(config_path: str):
     """
     try:
         with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
+            config = yaml.load(f, Loader=SafeLoader)
     except FileNotFoundError:
         print(f"Error: Config file not found at {config_path}")
         sys.exit(1)
@@ -27,8 +52,7 @@ def get_org_user_emails(config_path: str):
         sys.exit(1)
 
     github_config = config['github']
-    required_fields = ['org', 'auth_token']
-    missing_fields = [field for field in required_fields if field not in github_config]
+    missing_fields = sorted(REQUIRED_GITHUB_FIELDS - github_config.keys())
     if missing_fields:
         print(f"Error: Missing required fields in github config: {', '.join(missing_fields)}")
         sys.exit(1)
@@ -55,10 +79,11 @@ def get_org_user_emails(config_path: str):
     print("-" * 70)
 
     try:
-        members = org.get_members()
-        print(f"Found {members.totalCount} member(s) in the organization.")
+        requester = get_requester(org)
+        first_page = graphql_query(requester, MEMBERS_QUERY, {'org': org_name, 'cursor': None})['organization']['membersWithRole']
+        print(f"Found {first_page['totalCount']} member(s) in the organization.")
 
-        if members.totalCount == 0:
+        if not first_page['nodes']:
             print("No members were listed by the API.")
             print("This could be due to a few reasons:")
             print("  1. The GitHub token used may lack the necessary 'read:org' permission to list organization members.")
@@ -67,10 +92,18 @@ def get_org_user_emails(config_path: str):
             print("Please check your token scopes and organization settings.")
             sys.exit(0)
 
+        # GraphQL returns each member's public email with the listing, so no per-user
+        # requests are needed. Rows are printed page by page as they arrive.
+        members = first_page['nodes']
+        if first_page['pageInfo']['hasNextPage']:
+            members = itertools.chain(members, iter_graphql_nodes(
+                requester, MEMBERS_QUERY, {'org': org_name}, ('organization', 'membersWithRole'),
+                after=first_page['pageInfo']['endCursor']
+            ))
         for member in members:
-            user = g.get_user(member.login) # We need to fetch the full user object for the email
-            email = user.email if user.email else "Not publicly available"
-            print("{:<30} {:<40}".format(user.login, email))
+            # GraphQL reports an unset public email as an empty string
+            email = member['email'] or "Not publicly available"
+            print("{:<30} {:<40}".format(member['login'], email))
     except Exception as e:
         print(f"Error fetching members or member details: {e}")
         sys.exit(1)
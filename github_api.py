@@ -0,0 +1,175 @@
+import contextlib
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Requests in flight at once across all threads
+MAX_CONCURRENT_REQUESTS = 8
+MAX_RETRIES = 5
+
+
+class GitHubRateLimiter:
+    """Throttle GitHub requests shared between threads.
+
+    Every response's X-RateLimit-Remaining/X-RateLimit-Reset headers are recorded per
+    X-RateLimit-Resource, since GitHub meters REST (core) and GraphQL separately; once a
+    resource's quota is spent, its callers wait for the reset instead of spending requests
+    on errors.
+    HTTP 403/429 rate limit responses are retried by PyGithub's GithubRetry before they get
+    here, so this only retries payloads the caller flags as rate limited, such as GraphQL's
+    RATE_LIMITED errors, which arrive with a 200 status GithubRetry never sees.
+    """
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_REQUESTS, max_retries: int = MAX_RETRIES):
+        self.max_retries = max_retries
+        # Reset time of each spent rate limit resource, e.g. 'core' or 'graphql'
+        self.reset_at: Dict[str, float] = {}
+        self._semaphore = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+
+    def call(self, request: Callable[[], Tuple[Dict[str, str], Any]],
+             is_rate_limited: Callable[[Any], bool] = lambda payload: False,
+             resource: str = 'core') -> Tuple[Dict[str, str], Any]:
+        """Run `request`, which returns (headers, payload), retrying while `is_rate_limited(payload)`.
+
+        `resource` names the rate limit the request spends. The last rate limited payload is
+        returned once the retries run out.
+        """
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_reset(resource)
+            with self._semaphore:
+                headers, payload = request()
+            self._record(headers, resource)
+            if attempt == self.max_retries or not is_rate_limited(payload):
+                return headers, payload
+            time.sleep(self._retry_delay(headers, attempt))
+
+    def _record(self, headers: Dict[str, str], resource: str) -> None:
+        if headers.get('x-ratelimit-remaining') == '0' and 'x-ratelimit-reset' in headers:
+            resource = headers.get('x-ratelimit-resource', resource)
+            with self._lock:
+                self.reset_at[resource] = max(self.reset_at.get(resource, 0.0), float(headers['x-ratelimit-reset']))
+
+    def _wait_for_reset(self, resource: str) -> None:
+        with self._lock:
+            reset_at = self.reset_at.get(resource, 0.0)
+        delay = reset_at - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _retry_delay(self, headers: Dict[str, str], attempt: int) -> float:
+        if 'retry-after' in headers:
+            return float(headers['retry-after'])
+        if headers.get('x-ratelimit-remaining') == '0':
+            # _wait_for_reset sleeps until the quota comes back
+            return 0
+        return 2 ** attempt + random.uniform(0, 1)
+
+
+# Shared by every request made through this module
+RATE_LIMITER = GitHubRateLimiter()
+
+
+def get_requester(github_object):
+    """Return the PyGithub requester behind an object fetched through a client, such as an Organization.
+
+    PyGithub 2.1.1 has no public accessor, so the private attribute is read here only.
+    """
+    return github_object._requester
+
+
+def _is_graphql_rate_limited(response: Dict[str, Any]) -> bool:
+    return any(error.get('type') == 'RATE_LIMITED' for error in response.get('errors') or ())
+
+
+def _post_graphql(requester, query: str, variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """POST a GraphQL query, retrying RATE_LIMITED errors, and return the raw response."""
+    def request():
+        return requester.requestJsonAndCheck(
+            "POST", "/graphql", input={'query': query, 'variables': variables or {}}
+        )
+
+    _, response = RATE_LIMITER.call(request, _is_graphql_rate_limited, resource='graphql')
+    return response
+
+
+def _raise_errors(errors: List[Dict[str, Any]]) -> None:
+    if errors:
+        messages = '; '.join(error.get('message', str(error)) for error in errors)
+        raise ValueError(f"GraphQL query failed: {messages}")
+
+
+def graphql_query(requester, query: str, variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Run a GraphQL query through a PyGithub requester and return its data."""
+    response = _post_graphql(requester, query, variables)
+    _raise_errors(response.get('errors'))
+    return response['data']
+
+
+def find_missing_repositories(requester, owner: str, names: Sequence[str]) -> List[str]:
+    """Return the repositories in `names` that don't exist or aren't visible, using one request."""
+    if not names:
+        return []
+    params = ''.join(f', $name{i}: String!' for i in range(len(names)))
+    fields = ' '.join(f'repo{i}: repository(owner: $owner, name: $name{i}) {{ id }}' for i in range(len(names)))
+    variables = {'owner': owner, **{f'name{i}': name for i, name in enumerate(names)}}
+    response = _post_graphql(requester, f'query($owner: String!{params}) {{ {fields} }}', variables)
+    # A missing repository comes back as null with a NOT_FOUND error; anything else is a real failure
+    _raise_errors([error for error in response.get('errors') or () if error.get('type') != 'NOT_FOUND'])
+    data = response.get('data') or {}
+    return [name for i, name in enumerate(names) if data.get(f'repo{i}') is None]
+
+
+def iter_graphql_nodes(requester, query: str, variables: Dict[str, Any], path: Sequence[str],
+                       prefetch: bool = False, after: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Yield the nodes of a cursor-paginated connection, fetching one page at a time.
+
+    The query must take a `$cursor` variable and select `pageInfo { hasNextPage endCursor }`
+    on the connection found by following `path` from the query's data. Pages are only
+    requested as the caller consumes nodes, so breaking out of the loop stops pagination.
+    With `prefetch`, the next page is requested in the background as soon as a page
+    arrives, so fetching it overlaps with the caller's work on the current page. Pass
+    `after` to continue from the end cursor of a page the caller already fetched.
+    """
+    def fetch(cursor):
+        connection = graphql_query(requester, query, {**variables, 'cursor': cursor})
+        for key in path:
+            connection = connection[key]
+        return connection
+
+    with contextlib.ExitStack() as stack:
+        executor = stack.enter_context(ThreadPoolExecutor(max_workers=1)) if prefetch else None
+        connection = fetch(after)
+        while True:
+            page_info = connection['pageInfo']
+            if not page_info['hasNextPage']:
+                yield from connection['nodes']
+                return
+            next_page = executor.submit(fetch, page_info['endCursor']) if executor else None
+            yield from connection['nodes']
+            connection = next_page.result() if next_page else fetch(page_info['endCursor'])
+
+
+def conditional_get(requester, url: str, etag: Optional[str] = None) -> Tuple[int, Optional[str]]:
+    """GET a REST resource, sending If-None-Match when an ETag is known.
+
+    Returns the response status and the resource's current ETag. A 304 status means the
+    resource has not changed since `etag` was issued; such responses do not count against
+    the primary rate limit.
+    """
+    headers = {'If-None-Match': etag} if etag else None
+
+    def request():
+        status, response_headers, _ = requester.requestJson("GET", url, headers=headers)
+        return response_headers, status
+
+    response_headers, status = RATE_LIMITER.call(request)
+    return status, response_headers.get('etag')
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Parse a GitHub ISO 8601 timestamp into a timezone-aware datetime."""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
@@ -2,18 +2,110 @@
 
 import os
 import argparse
+import copy
+import heapq
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone, timedelta
 import yaml
 from github import Github, Auth
-from typing import Dict, List, Any, Union, NamedTuple
-from dataclasses import dataclass
-from statistics import mean
-from db_manager import DatabaseManager, PRStats
+from typing import Dict, Iterator, List, Any, NamedTuple, Tuple, Union
+from dataclasses import dataclass, field
+from db_manager import DatabaseManager, dumps_json, loads_json
+from github_api import conditional_get, find_missing_repositories, get_requester, iter_graphql_nodes, parse_timestamp
 import sys
+import threading
+import time
+import numpy as np
+import matplotlib
+# Graphs are only ever saved to files, so render headlessly without loading a GUI toolkit
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 from matplotlib.dates import DateFormatter
 import matplotlib.dates as mdates
 
+# libyaml's C parser when PyYAML was built with it, otherwise the pure-Python one
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+# Parsed config files keyed by path, with the (mtime, size) they were parsed at
+_YAML_CACHE: 'OrderedDict[str, tuple]' = OrderedDict()
+_YAML_CACHE_SIZE = 100
+
+# Default for github.cache_ttl_seconds: how long get_repo_stats reuses a repository's stats
+REPO_STATS_TTL = 300
+
+# Keys the config's github section must define
+REQUIRED_GITHUB_FIELDS = frozenset({'org', 'auth_token', 'repos'})
+
+# Repositories analyzed, and stale PRs' comments fetched, concurrently; kept low
+# to stay clear of GitHub's secondary rate limits
+MAX_WORKERS = 8
+# PyGithub spaces requests out across all threads, and every GraphQL query is a POST, so
+# counts as a write. These are its defaults, kept deliberately to stay clear of GitHub's
+# secondary rate limits; with that spacing MAX_WORKERS kept-alive connections are plenty.
+SECONDS_BETWEEN_REQUESTS = 0.25
+SECONDS_BETWEEN_WRITES = 1.0
+
+# Labels that put a PR on the verbose review list or exclude it from --noupdate
+READY_FOR_REVIEW_LABEL = "Ready for Review"
+DO_NOT_MERGE_LABEL = "DO NOT MERGE"
+
+# Open PRs with everything the report needs, 100 per request. Only approving reviews and
+# reopen events are counted, so their totals alone answer "approved?" and "reopened?".
+# Labels are only selected when asked for; a connection returns at most 100 nodes, so
+# labels beyond a PR's first 100 are not seen.
+OPEN_PRS_QUERY = '''
+query($owner: String!, $name: String!, $cursor: String, $withLabels: Boolean!) {
+  repository(owner: $owner, name: $name) {
+    pullRequests(states: [OPEN], first: 100, after: $cursor) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        number
+        title
+        url
+        createdAt
+        updatedAt
+        isDraft
+        comments { totalCount }
+        labels(first: 100) @include(if: $withLabels) { nodes { name } }
+        reviews(states: [APPROVED]) { totalCount }
+        timelineItems(itemTypes: [REOPENED_EVENT]) { totalCount }
+      }
+    }
+  }
+}
+'''
+
+def _load_yaml_cached(path: str) -> Dict:
+    """Load a YAML file, reusing the parsed result until the file's mtime or size changes.
+
+    Callers get a deep copy, so mutating the returned config never leaks into the cache.
+    """
+    st = os.stat(path)
+    cached = _YAML_CACHE.get(path)
+    if cached and cached[:2] == (st.st_mtime, st.st_size):
+        _YAML_CACHE.move_to_end(path)
+        return copy.deepcopy(cached[2])
+
+    with open(path, 'r') as f:
+        data = yaml.load(f, Loader=SafeLoader)
+    _YAML_CACHE[path] = (st.st_mtime, st.st_size, data)
+    _YAML_CACHE.move_to_end(path)
+    if len(_YAML_CACHE) > _YAML_CACHE_SIZE:
+        _YAML_CACHE.popitem(last=False)
+    return copy.deepcopy(data)
+
+def _stats_as_floats(stats: Dict) -> None:
+    """Convert a stats dict's numeric values to float, in place, for comparison formatting."""
+    for key in ['total_prs', 'avg_age_days', 'avg_age_days_excluding_oldest',
+                'avg_comments', 'avg_comments_with_comments', 'approved_prs',
+                'oldest_pr_age', 'prs_with_zero_comments', 'reopened_prs']:
+        if key in stats:
+            stats[key] = float(stats[key])
+
 # ANSI color codes
 class Colors:
     RED = '\033[91m'
@@ -34,7 +126,8 @@ class PRNoUpdateDetail(NamedTuple):
     is_approved: bool
     is_draft: bool
 
-@dataclass
+# The stored fields match db_manager.PRStats, plus the verbose-only PR lists
+@dataclass(slots=True, frozen=True)
 class PRStats:
     total_prs: int
     avg_age_days: float
@@ -47,37 +140,52 @@ class PRStats:
     prs_with_zero_comments: int
     reopened_prs: int
     # Not stored in DB, only used in verbose mode
-    zero_comment_prs: List[PRDetail] = None
-    no_update_prs: List[PRNoUpdateDetail] = None
+    zero_comment_prs: List[PRDetail] = field(default_factory=list)
+    no_update_prs: List[PRNoUpdateDetail] = field(default_factory=list)
+
+def _create_github_client(auth_token: str) -> Github:
+    """Create the GitHub client shared by the CLI's validation and its reporter."""
+    return Github(
+        auth=Auth.Token(auth_token),
+        pool_size=MAX_WORKERS,
+        seconds_between_requests=SECONDS_BETWEEN_REQUESTS,
+        seconds_between_writes=SECONDS_BETWEEN_WRITES
+    )
 
 class PRReporter:
-    def __init__(self, config: Union[str, Dict], verbose: bool = False, min_age_days: int = 0, compare_days: int = None, github_client=None, dbonly: bool = False, no_update_days: int = None):
+    def __init__(self, config: Union[str, Dict], verbose: bool = False, min_age_days: int = 0, compare_days: int = None, github_client=None, dbonly: bool = False, no_update_days: int = None, top_zero: int = None):
+        # A config path is parsed through the cache, so it is only re-read when the file changes
         if isinstance(config, str):
-            with open(config, 'r') as f:
-                self.config = yaml.safe_load(f)
+            self.config = _load_yaml_cached(config)
         else:
             self.config = config
+        github_config = self.config['github']
         
         self.verbose = verbose
         self.min_age_days = min_age_days
         self.compare_days = compare_days
         self.dbonly = dbonly
         self.no_update_days = no_update_days
+        self.top_zero = top_zero
+        self._print_lock = threading.Lock()
+        # Stats are memoized per repository as (time.monotonic() when fetched, stats); 0 disables the cache
+        self.cache_ttl = github_config.get('cache_ttl_seconds', REPO_STATS_TTL)
+        self._stats_cache: Dict[str, Tuple[float, PRStats]] = {}
         
         if not dbonly:
             if github_client is None:
-                auth = Auth.Token(self.config['github']['auth_token'])
-                self.github = Github(auth=auth)
+                self.github = _create_github_client(github_config['auth_token'])
             else:
                 self.github = github_client
                 
-            self.org = self.github.get_organization(self.config['github']['org'])
+            self.org = self.github.get_organization(github_config['org'])
         
         self.db = DatabaseManager()
 
     def _print_progress(self, message: str):
         """Print a progress message and flush to ensure immediate display."""
-        print(message, end='', flush=True)
+        with self._print_lock:
+            print(message, end='', flush=True)
 
     def _format_comparison(self, current: float, previous: float, format_str: str = "{:.1f}") -> str:
         """Format a value with comparison to previous value, using color coding."""
@@ -105,18 +213,31 @@ class PRReporter:
             stats = self.db.get_earliest_stats(repo_name)
             
         if stats:
-            # Convert numeric values to float
-            for key in ['total_prs', 'avg_age_days', 'avg_age_days_excluding_oldest', 
-                       'avg_comments', 'avg_comments_with_comments', 'approved_prs', 
-                       'oldest_pr_age', 'prs_with_zero_comments', 'reopened_prs']:
-                if key in stats:
-                    stats[key] = float(stats[key])
+            _stats_as_floats(stats)
             
         return stats
 
-    def _get_last_comment_date(self, pr) -> datetime:
-        """Get the date of the last comment on a PR."""
+    def _get_comparison_stats_many(self, repo_names: List[str]) -> Dict[str, Dict]:
+        """Get comparison stats for several repositories with one query per fallback step."""
+        if not self.compare_days:
+            return {}
+
+        target_date = datetime.now(timezone.utc) - timedelta(days=self.compare_days)
+        comparison = self.db.get_stats_before_date_many(repo_names, target_date)
+        # Repositories with no stats before the target date fall back to their earliest stats
+        without_stats = [repo_name for repo_name in repo_names if repo_name not in comparison]
+        if without_stats:
+            comparison.update(self.db.get_earliest_stats_many(without_stats))
+
+        for stats in comparison.values():
+            _stats_as_floats(stats)
+        return comparison
+
+    def _get_last_comment_date(self, repo, pr_node: Dict) -> datetime:
+        """Get the date of the last comment on a PR from the open PR listing."""
         try:
+            pr = repo.get_pull(pr_node['number'])
+            
             # Get all types of comments on the PR
             all_comments = []
             
@@ -153,12 +274,66 @@ class PRReporter:
                 # No comments, return PR creation date
                 return pr.created_at
         except Exception:
-            # If we can't get comments, return PR creation date
-            return pr.created_at
+            # If we can't get the PR or its comments, return PR creation date
+            return parse_timestamp(pr_node['createdAt'])
+
+    def _get_repo(self, repo_name: str):
+        """Get a repository object without fetching its metadata; only its PRs are ever requested."""
+        return self.github.get_repo(f"{self.config['github']['org']}/{repo_name}", lazy=True)
+
+    def _iter_open_prs(self, repo_name: str, with_labels: bool) -> Iterator[Dict]:
+        """Yield every open PR of a repository, with its comment, review and reopen details.
+
+        Labels are only selected when `with_labels` is set. PRs are yielded as pages arrive,
+        with the next page fetched in the background. The previous run's PRs are reused when
+        nothing in the repository has changed since.
+        """
+        # Any activity on any PR, including opening or closing one, moves it to the top of
+        # this listing, so its ETag only matches while every PR is unchanged. The closed PR
+        # analyzer probes the same listing, so the cached open PRs get their own key.
+        resource = f"/repos/{self.config['github']['org']}/{repo_name}/pulls?state=all&sort=updated&direction=desc&per_page=1"
+        # PRs cached without labels must not be reused by a run that reads them
+        cache_key = f"{resource}#open" + ("+labels" if with_labels else "")
+        cached = self.db.get_etag(cache_key)
+        status, etag = conditional_get(get_requester(self.org), resource, cached[0] if cached else None)
+        if status == 304 and cached:
+            yield from loads_json(cached[1])
+            return
+
+        prs = []
+        for pr in iter_graphql_nodes(
+            get_requester(self.org),
+            OPEN_PRS_QUERY,
+            {'owner': self.config['github']['org'], 'name': repo_name, 'withLabels': with_labels},
+            ('repository', 'pullRequests'),
+            prefetch=True
+        ):
+            prs.append(pr)
+            yield pr
+        if status == 200 and etag:
+            self.db.save_etag(cache_key, etag, dumps_json(prs))
+
+    def get_repo_stats(self, repo_name: str, save: bool = True) -> PRStats:
+        """Get statistics for a repository, either from API or database.
+
+        Stats fetched within the last `cache_ttl` seconds are reused. Fetched stats are
+        saved to the database unless `save` is False.
+        """
+        now = time.monotonic()
+        cached = self._stats_cache.get(repo_name)
+        if cached and now - cached[0] < self.cache_ttl:
+            stats = cached[1]
+        else:
+            stats = self._fetch_repo_stats(repo_name)
+            if self.cache_ttl > 0:
+                self._stats_cache[repo_name] = (now, stats)
+        if save and not self.dbonly:
+            self.db.save_stats(repo_name, stats)
+        return stats
 
-    def get_repo_stats(self, repo_name: str) -> PRStats:
-        """Get statistics for a repository, either from API or database."""
-        self._print_progress(f"\nAnalyzing {repo_name}... ")
+    def _fetch_repo_stats(self, repo_name: str) -> PRStats:
+        """Compute statistics for a repository from the API, or read them from the database."""
+        self._print_progress(f"Analyzing {repo_name}...\n")
         
         if self.dbonly:
             # Get today's stats from database
@@ -181,186 +356,213 @@ class PRReporter:
                 no_update_prs=[]  # Not stored in DB
             )
 
-        # Regular API-based flow
-        repo = self.org.get_repo(repo_name)
-        prs = list(repo.get_pulls(state='open'))
-        
-        if not prs:
-            self._print_progress("No open PRs found.\n")
-            stats = PRStats(
-                total_prs=0,
-                avg_age_days=0,
-                avg_age_days_excluding_oldest=0,
-                avg_comments=0,
-                avg_comments_with_comments=0,
-                approved_prs=0,
-                oldest_pr_age=0,
-                oldest_pr_title="",
-                prs_with_zero_comments=0,
-                reopened_prs=0,
-                zero_comment_prs=[],
-                no_update_prs=[]
-            )
-            self.db.save_stats(repo_name, stats)
-            return stats
-
-        self._print_progress(f"Found {len(prs)} PRs. Analyzing...\n")
-        ages = []
-        comments = []
-        comments_with_comments = []  # Only PRs that have comments
-        approved = 0
+        # Regular API-based flow. Running totals let PRs be processed as their pages arrive,
+        # without keeping per-PR lists
+        total_prs = 0
+        sum_ages = 0
+        sum_comments = 0
+        sum_comments_with_comments = 0
+        prs_with_comments = 0
         oldest_pr_age = 0
         oldest_pr_title = ""
-        prs_with_zero_comments = 0
+        approved = 0
         zero_comment_prs = []
-        no_update_prs = []
+        stale_prs = []  # --noupdate candidates whose comment history must be fetched
         reopened_count = 0
-
-        for i, pr in enumerate(prs, 1):
-            self._print_progress(f"\rProcessing PR {i}/{len(prs)}... ")
+        now = datetime.now(timezone.utc)
+        # Settings read once rather than looked up on self for every PR
+        list_zero_comment_prs = self.verbose
+        min_age_days = self.min_age_days
+        no_update_days = self.no_update_days
+        # Labels are only selected when the verbose listing or --noupdate needs them
+        with_labels = list_zero_comment_prs or no_update_days is not None
+
+        for pr in self._iter_open_prs(repo_name, with_labels):
+            total_prs += 1
             # Calculate age in days
-            created_at = pr.created_at
-            now = datetime.now(timezone.utc)
+            created_at = parse_timestamp(pr['createdAt'])
             age_days = (now - created_at).days
-            ages.append(age_days)
+            sum_ages += age_days
             
             # Track oldest PR
             if age_days > oldest_pr_age:
                 oldest_pr_age = age_days
-                oldest_pr_title = pr.title
+                oldest_pr_title = pr['title']
             
             # Get number of comments
-            comment_count = pr.comments
-            comments.append(comment_count)
+            comment_count = pr['comments']['totalCount']
+            sum_comments += comment_count
+            if comment_count > 0:
+                sum_comments_with_comments += comment_count
+                prs_with_comments += 1
+            
+            labels = {label['name'] for label in pr['labels']['nodes']} if with_labels else frozenset()
             
             # Check if PR has "Ready for Review" label
-            has_ready_label = any(label.name == "Ready for Review" for label in pr.labels)
+            if comment_count == 0 and list_zero_comment_prs and age_days >= min_age_days and READY_FOR_REVIEW_LABEL in labels:
+                zero_comment_prs.append(PRDetail(pr['title'], age_days, pr['url']))
             
-            if comment_count == 0:
-                prs_with_zero_comments += 1
-                if self.verbose and age_days >= self.min_age_days and has_ready_label:
-                    zero_comment_prs.append(PRDetail(pr.title, age_days, pr.html_url))
-            else:
-                comments_with_comments.append(comment_count)
+            is_approved = pr['reviews']['totalCount'] > 0
             
             # Check for PRs with no recent updates
-            if self.no_update_days is not None:
+            if no_update_days is not None:
                 # Skip PRs with "DO NOT MERGE" tag
-                has_do_not_merge = any(label.name == "DO NOT MERGE" for label in pr.labels)
-                if has_do_not_merge:
+                if DO_NOT_MERGE_LABEL in labels:
                     continue
-                    
-                last_comment_date = self._get_last_comment_date(pr)
-                days_since_last_comment = (now - last_comment_date).days
                 
                 # Get the last push date
-                last_push_date = pr.updated_at  # This is the last time the PR was updated (includes pushes)
+                last_push_date = parse_timestamp(pr['updatedAt'])  # This is the last time the PR was updated (includes pushes)
                 days_since_last_push = (now - last_push_date).days
                 
-                # Only include PRs where both last comment AND last push are older than threshold
-                if days_since_last_comment >= self.no_update_days and days_since_last_push >= self.no_update_days:
-                    # Check if PR is approved
-                    reviews = pr.get_reviews()
-                    is_approved = any(review.state == 'APPROVED' for review in reviews)
-                    # Check if PR is draft
-                    is_draft = pr.draft
-                    no_update_prs.append(PRNoUpdateDetail(pr.title, days_since_last_comment, pr.html_url, is_approved, is_draft))
+                # Comments also move updatedAt, so only PRs idle that long need their comments fetched
+                if days_since_last_push >= no_update_days:
+                    stale_prs.append((pr, is_approved))
             
             # Check if PR is approved
-            reviews = pr.get_reviews()
-            if any(review.state == 'APPROVED' for review in reviews):
+            if is_approved:
                 approved += 1
             
-            # Check if PR has been reopened by looking at timeline events
-            try:
-                timeline = pr.get_issue_events()
-                for event in timeline:
-                    if hasattr(event, 'event') and event.event == 'reopened':
-                        reopened_count += 1
-                        break  # Only count once per PR
-            except Exception:
-                # If we can't get timeline events, skip reopened count for this PR
-                pass
+            # Check if PR has been reopened
+            if pr['timelineItems']['totalCount'] > 0:
+                reopened_count += 1
 
-        # Calculate average excluding oldest PR
-        if len(ages) > 1:
-            # If we have multiple PRs, exclude the oldest one
-            ages_excluding_oldest = [age for age in ages if age < oldest_pr_age]
-            avg_age_excluding_oldest = mean(ages_excluding_oldest) if ages_excluding_oldest else 0
-        else:
-            # If we only have one PR, it's both the oldest and the only one
-            avg_age_excluding_oldest = 0
+        if not total_prs:
+            self._print_progress(f"{repo_name}: No open PRs found.\n")
+            return PRStats(
+                total_prs=0,
+                avg_age_days=0,
+                avg_age_days_excluding_oldest=0,
+                avg_comments=0,
+                avg_comments_with_comments=0,
+                approved_prs=0,
+                oldest_pr_age=0,
+                oldest_pr_title="",
+                prs_with_zero_comments=0,
+                reopened_prs=0,
+                zero_comment_prs=[],
+                no_update_prs=[]
+            )
+
+        self._print_progress(f"{repo_name}: Found {total_prs} PRs.\n")
+
+        # Each stale PR's comment history takes several REST requests, so fetch them concurrently
+        no_update_prs = []
+        if stale_prs:
+            repo = self._get_repo(repo_name)
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                last_comment_dates = executor.map(
+                    lambda stale: self._get_last_comment_date(repo, stale[0]), stale_prs
+                )
+                for (pr, is_approved), last_comment_date in zip(stale_prs, last_comment_dates):
+                    days_since_last_comment = (now - last_comment_date).days
+                    # Only include PRs where both last comment AND last push are older than threshold
+                    if days_since_last_comment >= no_update_days:
+                        no_update_prs.append(PRNoUpdateDetail(pr['title'], days_since_last_comment, pr['url'], is_approved, pr['isDraft']))
+
+        # Average excluding the single oldest PR; PRs tied with it still count
+        avg_age_excluding_oldest = (sum_ages - oldest_pr_age) / (total_prs - 1) if total_prs > 1 else 0
 
         stats = PRStats(
-            total_prs=len(prs),
-            avg_age_days=mean(ages) if ages else 0,
+            total_prs=total_prs,
+            avg_age_days=sum_ages / total_prs,
             avg_age_days_excluding_oldest=avg_age_excluding_oldest,
-            avg_comments=mean(comments) if comments else 0,
-            avg_comments_with_comments=mean(comments_with_comments) if comments_with_comments else 0,
+            avg_comments=sum_comments / total_prs,
+            avg_comments_with_comments=sum_comments_with_comments / prs_with_comments if prs_with_comments else 0,
             approved_prs=approved,
             oldest_pr_age=oldest_pr_age,
             oldest_pr_title=oldest_pr_title,
-            prs_with_zero_comments=prs_with_zero_comments,
+            prs_with_zero_comments=total_prs - prs_with_comments,
             reopened_prs=reopened_count,
-            zero_comment_prs=sorted(zero_comment_prs, key=lambda x: x.age_days, reverse=True) if self.verbose else [],
+            zero_comment_prs=self._oldest_first(zero_comment_prs) if self.verbose else [],
             no_update_prs=sorted(no_update_prs, key=lambda x: x.last_comment_days, reverse=True) if self.no_update_days is not None else []
         )
-        self.db.save_stats(repo_name, stats)
-        self._print_progress("Done!\n")
+        self._print_progress(f"{repo_name}: Done!\n")
         return stats
 
+    def _oldest_first(self, zero_comment_prs: List[PRDetail]) -> List[PRDetail]:
+        """Order PRs with no comments oldest first, keeping only the oldest `top_zero` when set."""
+        if self.top_zero is not None:
+            return heapq.nlargest(self.top_zero, zero_comment_prs, key=lambda x: x.age_days)
+        if len(zero_comment_prs) <= 1:
+            return zero_comment_prs
+        return sorted(zero_comment_prs, key=lambda x: x.age_days, reverse=True)
+
     def generate_report(self) -> Dict[str, PRStats]:
-        report = {}
-        total_repos = len(self.config['github']['repos'])
-        for i, repo_name in enumerate(self.config['github']['repos'], 1):
-            self._print_progress(f"\nProcessing repository {i}/{total_repos}: ")
-            report[repo_name] = self.get_repo_stats(repo_name)
+        repos = self.config['github']['repos']
+        self._print_progress(f"\nProcessing {len(repos)} repositories...\n")
+        
+        # Repositories are independent and mostly wait on GitHub, so analyze them concurrently
+        results = {}
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            futures = {executor.submit(self.get_repo_stats, repo_name, save=False): repo_name for repo_name in repos}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        # Keep the report in config order
+        report = {repo_name: results[repo_name] for repo_name in repos}
+        
+        # Save every repository's stats in one transaction rather than one commit each
+        if not self.dbonly:
+            self.db.save_stats_many(list(report.items()))
         return report
 
-    def generate_graph(self, days: int = 30, repo_name: str = None) -> None:
-        """Generate a line graph showing PR trends for each repository."""
-        if repo_name and repo_name not in self.config['github']['repos']:
-            raise ValueError(f"Repository '{repo_name}' not found in config. Available repositories: {', '.join(self.config['github']['repos'])}")
-
-        plt.figure(figsize=(12, 6))
+    def _plot_one(self, ax, repo: str, daily_counts: List[Tuple[str, int]]) -> None:
+        """Plot one repository's (date, total_prs) pairs on the given axes."""
+        date_strs, counts = zip(*daily_counts)
+        # Parse the YYYY-MM-DD dates in one numpy call rather than strptime per point
+        dates = np.array(date_strs, dtype='datetime64[D]')
+        pr_counts = np.array(counts, dtype=np.int64)
+        
+        # Plot the line
+        ax.plot(dates, pr_counts, marker='o', label=repo)
+
+    def generate_graph(self, days: int = 30, repo_name: str = None, ax=None) -> str:
+        """Generate a line graph showing PR trends for each repository.
+
+        Pass `ax` to draw onto an existing figure, which is cleared and reused rather than
+        creating and closing a new figure for every graph.
+        """
+        repos = self.config['github']['repos']
+        if repo_name and repo_name not in repos:
+            raise ValueError(f"Repository '{repo_name}' not found in config. Available repositories: {', '.join(repos)}")
+
+        if ax is None:
+            fig, ax = plt.subplots(figsize=(12, 6))
+            owns_figure = True
+        else:
+            ax.clear()
+            fig = ax.figure
+            owns_figure = False
         
         # Get the date range
         end_date = datetime.now(timezone.utc)
         start_date = end_date - timedelta(days=days)
         
         # Get data for each repository
-        repos_to_graph = [repo_name] if repo_name else self.config['github']['repos']
+        repos_to_graph = [repo_name] if repo_name else repos
         
         for repo in repos_to_graph:
-            # Get all stats for this repo within the date range
-            stats = self.db.get_stats_in_date_range(repo, start_date, end_date)
-            
-            if not stats:
-                continue
-                
-            # Extract dates and PR counts
-            dates = [datetime.strptime(stat['date'], '%Y-%m-%d') for stat in stats]
-            pr_counts = [stat['total_prs'] for stat in stats]
+            # Only the daily counts are plotted, so skip loading the full stats rows
+            daily_counts = self.db.get_daily_pr_counts(repo, start_date, end_date)
             
-            # Plot the line
-            plt.plot(dates, pr_counts, marker='o', label=repo)
+            if daily_counts:
+                self._plot_one(ax, repo, daily_counts)
         
         # Customize the graph
         title = f'Open PRs Trend for {repo_name}' if repo_name else 'Open PRs Trend'
-        plt.title(title)
-        plt.xlabel('Date')
-        plt.ylabel('Number of Open PRs')
-        plt.grid(True, linestyle='--', alpha=0.7)
+        ax.set_title(title)
+        ax.set_xlabel('Date')
+        ax.set_ylabel('Number of Open PRs')
+        ax.grid(True, linestyle='--', alpha=0.7)
         
         # Format x-axis dates
-        plt.gca().xaxis.set_major_formatter(DateFormatter('%Y-%m-%d'))
-        plt.gcf().autofmt_xdate()  # Rotate date labels
+        ax.xaxis.set_major_formatter(DateFormatter('%Y-%m-%d'))
+        fig.autofmt_xdate()  # Rotate date labels
         
         # Add legend
-        plt.legend()
+        ax.legend()
         
         # Adjust layout
-        plt.tight_layout()
+        fig.tight_layout()
         
         # Create graphs directory if it doesn't exist
         graphs_dir = 'graphs'
@@ -373,8 +575,9 @@ class PRReporter:
         filepath = os.path.join(graphs_dir, filename)
         
         # Save the graph
-        plt.savefig(filepath)
-        plt.close()
+        fig.savefig(filepath)
+        if owns_figure:
+            plt.close(fig)
         
         return filepath  # Return the path where the graph was saved
 
@@ -397,6 +600,9 @@ Examples:
   Show PRs with no comments that are at least 5 days old:
     python pr_reporter.py -v --min-age 5
 
+  Show only the 10 oldest PRs with no comments:
+    python pr_reporter.py -v --top-zero 10
+
   Show PRs with no comment or push activity in the last 30 days:
     python pr_reporter.py --noupdate 30
 
@@ -432,6 +638,11 @@ Examples:
         default=0,
         help='Minimum age in days for PRs to show in verbose mode. Only PRs with no comments that have been open for at least this many days will be shown. (default: 0)'
     )
+    parser.add_argument(
+        '--top-zero',
+        type=int,
+        help='Show only this many of the oldest PRs with no comments in verbose mode (default: all)'
+    )
     parser.add_argument(
         '--compare',
         nargs='?',
@@ -470,6 +681,9 @@ Examples:
     if args.min_age < 0:
         parser.error("Minimum age must be a non-negative integer")
 
+    if args.top_zero is not None and args.top_zero < 1:
+        parser.error("--top-zero must be a positive integer")
+
     if args.compare is not None and args.compare < 0:
         parser.error("Comparison days must be a non-negative integer")
 
@@ -494,8 +708,7 @@ github:
         sys.exit(1)
 
     try:
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
+        config = _load_yaml_cached(config_path)
     except yaml.YAMLError as e:
         print("Error: Invalid YAML format in config file.")
         print("\nCommon YAML formatting issues:")
@@ -524,8 +737,7 @@ github:
             raise KeyError("Missing 'github' section")
         
         github_config = config['github']
-        required_fields = ['org', 'auth_token', 'repos']
-        missing_fields = [field for field in required_fields if field not in github_config]
+        missing_fields = sorted(REQUIRED_GITHUB_FIELDS - github_config.keys())
         if missing_fields:
             raise KeyError(f"Missing required fields: {', '.join(missing_fields)}")
         
@@ -535,9 +747,8 @@ github:
         if not github_config['repos']:
             raise ValueError("'repos' list cannot be empty")
 
-        # Initialize GitHub client to validate token and org
-        auth = Auth.Token(github_config['auth_token'])
-        github = Github(auth=auth)
+        # Initialize GitHub client to validate token and org; the reporter reuses it
+        github = _create_github_client(github_config['auth_token'])
         
         try:
             org = github.get_organization(github_config['org'])
@@ -561,13 +772,8 @@ github:
             else:
                 raise
 
-        # Validate repositories
-        invalid_repos = []
-        for repo_name in github_config['repos']:
-            try:
-                org.get_repo(repo_name)
-            except Exception:
-                invalid_repos.append(repo_name)
+        # Validate every repository in a single request rather than one get_repo call each
+        invalid_repos = find_missing_repositories(get_requester(org), github_config['org'], github_config['repos'])
         
         if invalid_repos:
             print(f"Error: The following repositories were not found in organization '{github_config['org']}':")
@@ -581,7 +787,7 @@ github:
 
         # Auto-enable verbose mode if --noupdate is used, so users can see the PR list
         verbose_mode = args.verbose or args.noupdate is not None
-        reporter = PRReporter(config, verbose=verbose_mode, min_age_days=args.min_age, compare_days=args.compare, dbonly=args.dbonly, no_update_days=args.noupdate)
+        reporter = PRReporter(config, verbose=verbose_mode, min_age_days=args.min_age, compare_days=args.compare, github_client=github, dbonly=args.dbonly, no_update_days=args.noupdate, top_zero=args.top_zero)
         
         if args.graph:
             # Generate graph without running API queries
@@ -591,69 +797,72 @@ github:
         
         # Generate report as usual
         report = reporter.generate_report()
+        today_str = datetime.now(timezone.utc).strftime('%Y-%m-%d')
+        latest_by_repo = reporter.db.get_latest_stats_many(list(report))
+        comparison_by_repo = reporter._get_comparison_stats_many(list(report)) if args.compare is not None else {}
 
         print("\nGitHub PR Report")
         print("=" * 50)
         
         for repo_name, stats in report.items():
-            print(f"\nRepository: {repo_name}")
+            lines = [f"\nRepository: {repo_name}"]
             
             # Get comparison stats if compare is enabled
-            comparison_stats = reporter._get_comparison_stats(repo_name) if args.compare is not None else None
+            comparison_stats = comparison_by_repo.get(repo_name)
             
             # Print stats with comparison if available
             if comparison_stats:
-                print(f"Total Open PRs: {reporter._format_comparison(stats.total_prs, comparison_stats['total_prs'], '{:.0f}')}")
-                print(f"Average PR Age: {reporter._format_comparison(stats.avg_age_days, comparison_stats['avg_age_days'])} days")
-                print(f"Average PR Age (excluding oldest): {reporter._format_comparison(stats.avg_age_days_excluding_oldest, comparison_stats['avg_age_days_excluding_oldest'])} days")
-                print(f"Average Comments per PR: {reporter._format_comparison(stats.avg_comments, comparison_stats['avg_comments'])}")
-                print(f"Average Comments (PRs with comments): {reporter._format_comparison(stats.avg_comments_with_comments, comparison_stats['avg_comments_with_comments'])}")
-                print(f"PRs with Zero Comments: {reporter._format_comparison(stats.prs_with_zero_comments, comparison_stats['prs_with_zero_comments'], '{:.0f}')}")
-                print(f"Approved PRs: {reporter._format_comparison(stats.approved_prs, comparison_stats['approved_prs'], '{:.0f}')}")
-                print(f"Reopened PRs: {reporter._format_comparison(stats.reopened_prs, comparison_stats.get('reopened_prs', 0), '{:.0f}')}")
-                print(f"\nComparison date: {comparison_stats['date']}")
+                lines.append(f"Total Open PRs: {reporter._format_comparison(stats.total_prs, comparison_stats['total_prs'], '{:.0f}')}")
+                lines.append(f"Average PR Age: {reporter._format_comparison(stats.avg_age_days, comparison_stats['avg_age_days'])} days")
+                lines.append(f"Average PR Age (excluding oldest): {reporter._format_comparison(stats.avg_age_days_excluding_oldest, comparison_stats['avg_age_days_excluding_oldest'])} days")
+                lines.append(f"Average Comments per PR: {reporter._format_comparison(stats.avg_comments, comparison_stats['avg_comments'])}")
+                lines.append(f"Average Comments (PRs with comments): {reporter._format_comparison(stats.avg_comments_with_comments, comparison_stats['avg_comments_with_comments'])}")
+                lines.append(f"PRs with Zero Comments: {reporter._format_comparison(stats.prs_with_zero_comments, comparison_stats['prs_with_zero_comments'], '{:.0f}')}")
+                lines.append(f"Approved PRs: {reporter._format_comparison(stats.approved_prs, comparison_stats['approved_prs'], '{:.0f}')}")
+                lines.append(f"Reopened PRs: {reporter._format_comparison(stats.reopened_prs, comparison_stats.get('reopened_prs', 0), '{:.0f}')}")
+                lines.append(f"\nComparison date: {comparison_stats['date']}")
             else:
-                print(f"Total Open PRs: {stats.total_prs}")
-                print(f"Average PR Age: {stats.avg_age_days:.1f} days")
-                print(f"Average PR Age (excluding oldest): {stats.avg_age_days_excluding_oldest:.1f} days")
-                print(f"Average Comments per PR: {stats.avg_comments:.1f}")
-                print(f"Average Comments (PRs with comments): {stats.avg_comments_with_comments:.1f}")
-                print(f"PRs with Zero Comments: {stats.prs_with_zero_comments}")
-                print(f"Approved PRs: {stats.approved_prs}")
-                print(f"Reopened PRs: {stats.reopened_prs}")
+                lines.append(f"Total Open PRs: {stats.total_prs}")
+                lines.append(f"Average PR Age: {stats.avg_age_days:.1f} days")
+                lines.append(f"Average PR Age (excluding oldest): {stats.avg_age_days_excluding_oldest:.1f} days")
+                lines.append(f"Average Comments per PR: {stats.avg_comments:.1f}")
+                lines.append(f"Average Comments (PRs with comments): {stats.avg_comments_with_comments:.1f}")
+                lines.append(f"PRs with Zero Comments: {stats.prs_with_zero_comments}")
+                lines.append(f"Approved PRs: {stats.approved_prs}")
+                lines.append(f"Reopened PRs: {stats.reopened_prs}")
 
             if stats.oldest_pr_age > 0:
-                print(f"Oldest PR: {stats.oldest_pr_title} ({stats.oldest_pr_age} days old)")
+                lines.append(f"Oldest PR: {stats.oldest_pr_title} ({stats.oldest_pr_age} days old)")
 
             # In verbose mode, show details of PRs with no comments
             if args.verbose and stats.zero_comment_prs:
-                print("\nPRs with no comments:")
+                lines.append("\nPRs with no comments:")
                 if args.min_age > 0:
-                    print(f"(showing only PRs open for at least {args.min_age} days)")
+                    lines.append(f"(showing only PRs open for at least {args.min_age} days)")
                 for pr in stats.zero_comment_prs:
-                    print(f"  - [{pr.age_days} days] {pr.title}")
-                    print(f"    {pr.url}")
+                    lines.append(f"  - [{pr.age_days} days] {pr.title}")
+                    lines.append(f"    {pr.url}")
 
             # Show previous stats if available
-            prev_stats = reporter.db.get_latest_stats(repo_name)
-            if prev_stats and prev_stats['date'] != datetime.now(timezone.utc).strftime('%Y-%m-%d'):
-                print("\nPrevious Stats (from {})".format(prev_stats['date']))
-                print(f"Total Open PRs: {prev_stats['total_prs']}")
-                print(f"Average PR Age: {prev_stats['avg_age_days']:.1f} days")
-                print(f"Average PR Age (excluding oldest): {prev_stats['avg_age_days_excluding_oldest']:.1f} days")
-                print(f"Average Comments per PR: {prev_stats['avg_comments']:.1f}")
-                print(f"Average Comments (PRs with comments): {prev_stats['avg_comments_with_comments']:.1f}")
-                print(f"PRs with Zero Comments: {prev_stats['prs_with_zero_comments']}")
-                print(f"Approved PRs: {prev_stats['approved_prs']}")
-                print(f"Reopened PRs: {prev_stats.get('reopened_prs', 0)}")
+            prev_stats = latest_by_repo.get(repo_name)
+            if prev_stats and prev_stats['date'] != today_str:
+                lines.append("\nPrevious Stats (from {})".format(prev_stats['date']))
+                lines.append(f"Total Open PRs: {prev_stats['total_prs']}")
+                lines.append(f"Average PR Age: {prev_stats['avg_age_days']:.1f} days")
+                lines.append(f"Average PR Age (excluding oldest): {prev_stats['avg_age_days_excluding_oldest']:.1f} days")
+                lines.append(f"Average Comments per PR: {prev_stats['avg_comments']:.1f}")
+                lines.append(f"Average Comments (PRs with comments): {prev_stats['avg_comments_with_comments']:.1f}")
+                lines.append(f"PRs with Zero Comments: {prev_stats['prs_with_zero_comments']}")
+                lines.append(f"Approved PRs: {prev_stats['approved_prs']}")
+                lines.append(f"Reopened PRs: {prev_stats.get('reopened_prs', 0)}")
                 if prev_stats['oldest_pr_age'] > 0:
-                    print(f"Oldest PR: {prev_stats['oldest_pr_title']} ({prev_stats['oldest_pr_age']} days old)")
+                    lines.append(f"Oldest PR: {prev_stats['oldest_pr_title']} ({prev_stats['oldest_pr_age']} days old)")
 
             # Show details of PRs with no recent updates if --noupdate is set
             if args.noupdate is not None:
                 if stats.no_update_prs:
-                    print("\nPRs with no recent updates:")
-                    print(f"(showing only PRs with no comment or push in the last {args.noupdate} days or more)")
+                    lines.append("\nPRs with no recent updates:")
+                    lines.append(f"(showing only PRs with no comment or push in the last {args.noupdate} days or more)")
                     for pr in stats.no_update_prs:
                         # Use green color for approved PRs, yellow for draft PRs
                         if pr.is_approved:
@@ -662,10 +871,13 @@ github:
                             color = Colors.YELLOW
                         else:
                             color = Colors.WHITE
-                        print(f"  - [{pr.last_comment_days} days] {color}{pr.title}{Colors.RESET}")
-                        print(f"    {pr.url}")
+                        lines.append(f"  - [{pr.last_comment_days} days] {color}{pr.title}{Colors.RESET}")
+                        lines.append(f"    {pr.url}")
                 else:
-                    print(f"\nNo PRs found with no comment or push activity in the last {args.noupdate} days or more.")
+                    lines.append(f"\nNo PRs found with no comment or push activity in the last {args.noupdate} days or more.")
+
+            # One write per repository rather than one per line
+            sys.stdout.write("\n".join(lines) + "\n")
 
     except Exception as e:
         print(f"Error: {e}")
@@ -1,7 +1,12 @@
 import pytest
 from datetime import datetime, timezone, timedelta
 from unittest.mock import Mock, patch
-from closed_pr_analyzer import ClosedPRAnalyzer
+from closed_pr_analyzer import ClosedPRAnalyzer, _age_stats, _github_timestamp
+
+@pytest.fixture(autouse=True)
+def run_in_tmp_path(tmp_path, monkeypatch):
+    # The analyzer keeps its cache in pr_stats.db in the working directory
+    monkeypatch.chdir(tmp_path)
 
 @pytest.fixture
 def mock_config():
@@ -13,18 +18,53 @@ def mock_config():
         }
     }
 
+def pr_node(number, created_at, closed_at, login, reopened_at=()):
+    """Build a pull request node as returned by the closed PRs GraphQL query."""
+    return {
+        'number': number,
+        'createdAt': created_at.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'closedAt': closed_at.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'author': {'login': login} if login else None,
+        'timelineItems': {'nodes': [{'createdAt': event.strftime('%Y-%m-%dT%H:%M:%SZ')} for event in reopened_at]}
+    }
+
+def mock_closed_prs(mock_org, nodes):
+    """Serve the given nodes as a single page of GraphQL results."""
+    mock_org._requester.requestJsonAndCheck.return_value = ({}, {
+        'data': {
+            'repository': {
+                'pullRequests': {
+                    'pageInfo': {'hasNextPage': False, 'endCursor': None},
+                    'nodes': nodes
+                }
+            }
+        }
+    })
+
 @pytest.fixture
 def mock_github():
     github_client = Mock()
     org = Mock()
+    org._requester.requestJson.return_value = (200, {'etag': 'W/"abc"'}, '[]')
     github_client.get_organization.return_value = org
     return github_client, org
 
+def test_age_stats():
+    assert _age_stats([]) == (0, 0, 0)
+    assert _age_stats([4.0]) == (1, 4.0, 0)
+    count, avg, std = _age_stats([2.0, 4.0, 6.0])
+    assert (count, avg) == (3, 4.0)
+    assert std == pytest.approx(2.0)  # Sample standard deviation
+
+def test_github_timestamp():
+    moment = datetime(2024, 3, 21, 10, 5, 30, 999, tzinfo=timezone.utc)
+    assert _github_timestamp(moment) == '2024-03-21T10:05:30Z'
+    # Other offsets are converted to UTC first, so string order matches time order
+    assert _github_timestamp(moment.astimezone(timezone(timedelta(hours=-5)))) == '2024-03-21T10:05:30Z'
+
 def test_analyze_repo_no_prs(mock_config, mock_github):
     github_client, mock_org = mock_github
-    repo = Mock()
-    mock_org.get_repo.return_value = repo
-    repo.get_pulls.return_value = []
+    mock_closed_prs(mock_org, [])
     
     analyzer = ClosedPRAnalyzer(mock_config, days=28, github_client=github_client)
     stats = analyzer.analyze_repo('repo1')
@@ -39,27 +79,14 @@ def test_analyze_repo_no_prs(mock_config, mock_github):
 
 def test_analyze_repo_with_prs(mock_config, mock_github):
     github_client, mock_org = mock_github
-    repo = Mock()
-    mock_org.get_repo.return_value = repo
     
     # Create mock PRs
     now = datetime.now(timezone.utc)
-    pr1 = Mock()
-    pr1.closed_at = now - timedelta(days=1)
-    pr1.created_at = now - timedelta(days=6)  # 5 days open
-    pr1.user.login = 'user1'
-    
-    pr2 = Mock()
-    pr2.closed_at = now - timedelta(days=2)
-    pr2.created_at = now - timedelta(days=7)  # 5 days open
-    pr2.user.login = 'user2'
-    
-    pr3 = Mock()
-    pr3.closed_at = now - timedelta(days=30)  # Outside our window
-    pr3.created_at = now - timedelta(days=35)
-    pr3.user.login = 'user1'
-    
-    repo.get_pulls.return_value = [pr1, pr2, pr3]
+    mock_closed_prs(mock_org, [
+        pr_node(1, now - timedelta(days=6), now - timedelta(days=1), 'user1'),  # 5 days open
+        pr_node(2, now - timedelta(days=7), now - timedelta(days=2), 'user2'),  # 5 days open
+        pr_node(3, now - timedelta(days=35), now - timedelta(days=30), 'user1'),  # Outside our window
+    ])
     
     analyzer = ClosedPRAnalyzer(mock_config, days=28, github_client=github_client)
     stats = analyzer.analyze_repo('repo1')
@@ -72,29 +99,33 @@ def test_analyze_repo_with_prs(mock_config, mock_github):
     assert stats['user_avg_days_open'] == 0
     assert stats['user_std_dev_days'] == 0
 
+def test_analyze_repo_counts_reopened_prs(mock_config, mock_github):
+    github_client, mock_org = mock_github
+    now = datetime.now(timezone.utc)
+    mock_closed_prs(mock_org, [
+        pr_node(1, now - timedelta(days=6), now - timedelta(days=1), 'user1', reopened_at=[now - timedelta(days=3)]),
+        pr_node(2, now - timedelta(days=60), now - timedelta(days=2), 'user2', reopened_at=[now - timedelta(days=50)]),  # Reopened before the window
+        pr_node(3, now - timedelta(days=7), now - timedelta(days=2), 'user2'),
+    ])
+
+    analyzer = ClosedPRAnalyzer(mock_config, days=28, github_client=github_client)
+    stats = analyzer.analyze_repo('repo1')
+
+    assert stats['total_closed'] == 3
+    assert stats['reopened_count'] == 1
+    query = mock_org._requester.requestJsonAndCheck.call_args.kwargs['input']['query']
+    assert 'timelineItems(itemTypes: [REOPENED_EVENT], last: 1)' in query
+
 def test_analyze_repo_with_user_tracking(mock_config, mock_github):
     github_client, mock_org = mock_github
-    repo = Mock()
-    mock_org.get_repo.return_value = repo
     
     # Create mock PRs
     now = datetime.now(timezone.utc)
-    pr1 = Mock()
-    pr1.closed_at = now - timedelta(days=1)
-    pr1.created_at = now - timedelta(days=6)  # 5 days open
-    pr1.user.login = 'user1'
-    
-    pr2 = Mock()
-    pr2.closed_at = now - timedelta(days=2)
-    pr2.created_at = now - timedelta(days=7)  # 5 days open
-    pr2.user.login = 'user2'
-    
-    pr3 = Mock()
-    pr3.closed_at = now - timedelta(days=3)
-    pr3.created_at = now - timedelta(days=8)  # 5 days open
-    pr3.user.login = 'user1'
-    
-    repo.get_pulls.return_value = [pr1, pr2, pr3]
+    mock_closed_prs(mock_org, [
+        pr_node(1, now - timedelta(days=6), now - timedelta(days=1), 'user1'),  # 5 days open
+        pr_node(2, now - timedelta(days=7), now - timedelta(days=2), 'user2'),  # 5 days open
+        pr_node(3, now - timedelta(days=8), now - timedelta(days=3), 'user1'),  # 5 days open
+    ])
     
     analyzer = ClosedPRAnalyzer(mock_config, days=28, user_login='user1', github_client=github_client)
     stats = analyzer.analyze_repo('repo1')
@@ -106,29 +137,109 @@ def test_analyze_repo_with_user_tracking(mock_config, mock_github):
     assert stats['user_avg_days_open'] == 5.0  # (5 + 5) / 2
     assert stats['user_std_dev_days'] == 0.0  # Standard deviation of [5, 5]
 
+def test_analyze_repo_stops_paging_at_start_date(mock_config, mock_github):
+    github_client, mock_org = mock_github
+    now = datetime.now(timezone.utc)
+    first_page = {
+        'data': {
+            'repository': {
+                'pullRequests': {
+                    'pageInfo': {'hasNextPage': True, 'endCursor': 'cursor1'},
+                    'nodes': [
+                        pr_node(1, now - timedelta(days=6), now - timedelta(days=1), 'user1'),
+                        pr_node(2, now - timedelta(days=40), now - timedelta(days=35), 'user1'),  # Before the window
+                    ]
+                }
+            }
+        }
+    }
+    mock_org._requester.requestJsonAndCheck.side_effect = [({}, first_page), AssertionError("fetched a second page")]
+
+    analyzer = ClosedPRAnalyzer(mock_config, days=28, github_client=github_client)
+    stats = analyzer.analyze_repo('repo1')
+
+    assert stats['total_closed'] == 1
+    assert mock_org._requester.requestJsonAndCheck.call_count == 1
+
+def test_analyze_repo_reuses_cached_prs_when_unchanged(mock_config, mock_github):
+    github_client, mock_org = mock_github
+    now = datetime.now(timezone.utc)
+    mock_closed_prs(mock_org, [
+        pr_node(1, now - timedelta(days=6), now - timedelta(days=1), 'user1'),
+    ])
+
+    analyzer = ClosedPRAnalyzer(mock_config, days=28, github_client=github_client, refresh=True)
+    first = analyzer.analyze_repo('repo1')
+
+    # The listing ETag still matches, so the second run must not query GraphQL
+    mock_org._requester.requestJson.return_value = (304, {'etag': 'W/"abc"'}, '')
+    mock_org._requester.requestJsonAndCheck.reset_mock()
+    second = analyzer.analyze_repo('repo1')
+
+    headers = mock_org._requester.requestJson.call_args.kwargs['headers']
+    assert headers == {'If-None-Match': 'W/"abc"'}
+    mock_org._requester.requestJsonAndCheck.assert_not_called()
+    assert second['total_closed'] == first['total_closed'] == 1
+
+def test_analyze_repo_reuses_todays_result(mock_config, mock_github):
+    github_client, mock_org = mock_github
+    now = datetime.now(timezone.utc)
+    mock_closed_prs(mock_org, [
+        pr_node(1, now - timedelta(days=6), now - timedelta(days=1), 'user1'),
+        pr_node(2, now - timedelta(days=4), now - timedelta(days=2), 'user2'),
+    ])
+
+    first = ClosedPRAnalyzer(mock_config, days=28, github_client=github_client).analyze_repo('repo1')
+
+    # A second run on the same day answers from the database without touching GitHub
+    mock_org._requester.reset_mock()
+    second = ClosedPRAnalyzer(mock_config, days=28, github_client=github_client).analyze_repo('repo1')
+    mock_org._requester.requestJson.assert_not_called()
+    mock_org._requester.requestJsonAndCheck.assert_not_called()
+    assert second == first
+    assert second['ages'] == [5.0, 2.0]
+
+    # --refresh goes back to GitHub
+    ClosedPRAnalyzer(mock_config, days=28, github_client=github_client, refresh=True).analyze_repo('repo1')
+    mock_org._requester.requestJson.assert_called_once()
+
+def test_analyze_repo_refetches_when_cache_too_short(mock_config, mock_github):
+    github_client, mock_org = mock_github
+    now = datetime.now(timezone.utc)
+    mock_closed_prs(mock_org, [
+        pr_node(1, now - timedelta(days=6), now - timedelta(days=1), 'user1'),
+    ])
+
+    ClosedPRAnalyzer(mock_config, days=7, github_client=github_client).analyze_repo('repo1')
+
+    # A longer period than the cached listing covers needs a fresh query
+    mock_org._requester.requestJson.return_value = (304, {'etag': 'W/"abc"'}, '')
+    mock_org._requester.requestJsonAndCheck.reset_mock()
+    ClosedPRAnalyzer(mock_config, days=28, github_client=github_client).analyze_repo('repo1')
+
+    mock_org._requester.requestJsonAndCheck.assert_called_once()
+
+    # The wider listing was cached, so the next 28-day run with an unchanged repository reuses it
+    mock_org._requester.requestJsonAndCheck.reset_mock()
+    ClosedPRAnalyzer(mock_config, days=28, github_client=github_client, refresh=True).analyze_repo('repo1')
+
+    mock_org._requester.requestJsonAndCheck.assert_not_called()
+
 def test_generate_report(mock_config, mock_github):
     github_client, mock_org = mock_github
-    repo = Mock()
-    mock_org.get_repo.return_value = repo
     
     # Create mock PRs
     now = datetime.now(timezone.utc)
-    pr1 = Mock()
-    pr1.closed_at = now - timedelta(days=1)
-    pr1.created_at = now - timedelta(days=5)
-    pr1.user.login = 'user1'
-    
-    pr2 = Mock()
-    pr2.closed_at = now - timedelta(days=2)
-    pr2.created_at = now - timedelta(days=8)
-    pr2.user.login = 'user2'
-    
-    repo.get_pulls.return_value = [pr1, pr2]
+    mock_closed_prs(mock_org, [
+        pr_node(1, now - timedelta(days=5), now - timedelta(days=1), 'user1'),
+        pr_node(2, now - timedelta(days=8), now - timedelta(days=2), 'user2'),
+    ])
     
     analyzer = ClosedPRAnalyzer(mock_config, days=28, github_client=github_client)
     report = analyzer.generate_report()
     
     assert len(report) == 2
+    assert list(report) == ['repo1', 'repo2']  # Config order, regardless of completion order
     assert 'repo1' in report
     assert 'repo2' in report
     assert report['repo1']['total_closed'] == 2
@@ -136,22 +247,13 @@ def test_generate_report(mock_config, mock_github):
 
 def test_generate_report_with_user_tracking(mock_config, mock_github):
     github_client, mock_org = mock_github
-    repo = Mock()
-    mock_org.get_repo.return_value = repo
     
     # Create mock PRs
     now = datetime.now(timezone.utc)
-    pr1 = Mock()
-    pr1.closed_at = now - timedelta(days=1)
-    pr1.created_at = now - timedelta(days=5)
-    pr1.user.login = 'user1'
-    
-    pr2 = Mock()
-    pr2.closed_at = now - timedelta(days=2)
-    pr2.created_at = now - timedelta(days=8)
-    pr2.user.login = 'user2'
-    
-    repo.get_pulls.return_value = [pr1, pr2]
+    mock_closed_prs(mock_org, [
+        pr_node(1, now - timedelta(days=5), now - timedelta(days=1), 'user1'),
+        pr_node(2, now - timedelta(days=8), now - timedelta(days=2), 'user2'),
+    ])
     
     analyzer = ClosedPRAnalyzer(mock_config, days=28, user_login='user1', github_client=github_client)
     report = analyzer.generate_report()
@@ -166,22 +268,13 @@ def test_generate_report_with_user_tracking(mock_config, mock_github):
 
 def test_print_report(mock_config, mock_github, capsys):
     github_client, mock_org = mock_github
-    repo = Mock()
-    mock_org.get_repo.return_value = repo
     
     # Create mock PRs
     now = datetime.now(timezone.utc)
-    pr1 = Mock()
-    pr1.closed_at = now - timedelta(days=1)
-    pr1.created_at = now - timedelta(days=5)
-    pr1.user.login = 'user1'
-    
-    pr2 = Mock()
-    pr2.closed_at = now - timedelta(days=2)
-    pr2.created_at = now - timedelta(days=8)
-    pr2.user.login = 'user2'
-    
-    repo.get_pulls.return_value = [pr1, pr2]
+    mock_closed_prs(mock_org, [
+        pr_node(1, now - timedelta(days=5), now - timedelta(days=1), 'user1'),
+        pr_node(2, now - timedelta(days=8), now - timedelta(days=2), 'user2'),
+    ])
     
     analyzer = ClosedPRAnalyzer(mock_config, days=28, github_client=github_client)
     report = analyzer.generate_report()
@@ -194,25 +287,19 @@ def test_print_report(mock_config, mock_github, capsys):
     assert "Repository: repo2" in captured.out
     assert "Total Closed PRs: 2" in captured.out
     assert "Overall Statistics" in captured.out
+    assert "Overall Average Days Open: 5.0" in captured.out  # Ages 4 and 6 in both repos
+    # Overall figures come from the analyzed report, not a second PR listing
+    mock_org.get_repo.assert_not_called()
 
 def test_print_report_with_user_tracking(mock_config, mock_github, capsys):
     github_client, mock_org = mock_github
-    repo = Mock()
-    mock_org.get_repo.return_value = repo
     
     # Create mock PRs
     now = datetime.now(timezone.utc)
-    pr1 = Mock()
-    pr1.closed_at = now - timedelta(days=1)
-    pr1.created_at = now - timedelta(days=5)
-    pr1.user.login = 'user1'
-    
-    pr2 = Mock()
-    pr2.closed_at = now - timedelta(days=2)
-    pr2.created_at = now - timedelta(days=8)
-    pr2.user.login = 'user2'
-    
-    repo.get_pulls.return_value = [pr1, pr2]
+    mock_closed_prs(mock_org, [
+        pr_node(1, now - timedelta(days=5), now - timedelta(days=1), 'user1'),
+        pr_node(2, now - timedelta(days=8), now - timedelta(days=2), 'user2'),
+    ])
     
     analyzer = ClosedPRAnalyzer(mock_config, days=28, user_login='user1', github_client=github_client)
     report = analyzer.generate_report()
@@ -227,24 +314,34 @@ def test_print_report_with_user_tracking(mock_config, mock_github, capsys):
     assert "Statistics for user1" in captured.out
     assert "Overall Statistics for user1" in captured.out
 
-def test_print_report_with_all_users(mock_config, mock_github, capsys):
+def test_print_report_user_overall_uses_individual_ages(mock_config, mock_github, capsys):
     github_client, mock_org = mock_github
-    repo = Mock()
-    mock_org.get_repo.return_value = repo
     
-    # Create mock PRs
     now = datetime.now(timezone.utc)
-    pr1 = Mock()
-    pr1.closed_at = now - timedelta(days=1)
-    pr1.created_at = now - timedelta(days=5)
-    pr1.user.login = 'user1'
+    mock_closed_prs(mock_org, [
+        pr_node(1, now - timedelta(days=5), now - timedelta(days=1), 'user1'),  # 4 days open
+        pr_node(2, now - timedelta(days=10), now - timedelta(days=2), 'user1'),  # 8 days open
+    ])
     
-    pr2 = Mock()
-    pr2.closed_at = now - timedelta(days=2)
-    pr2.created_at = now - timedelta(days=8)
-    pr2.user.login = 'user2'
+    analyzer = ClosedPRAnalyzer(mock_config, days=28, user_login='user1', github_client=github_client)
+    report = analyzer.generate_report()
+    analyzer.print_report(report, 28, 'user1')
     
-    repo.get_pulls.return_value = [pr1, pr2]
+    overall = capsys.readouterr().out.split("Overall Statistics for user1")[1]
+    assert "Total Closed PRs: 4" in overall
+    assert "Average Days Open: 6.0" in overall
+    # Sample stdev of [4, 8, 4, 8], not of the per-repo means [6, 6, 6, 6]
+    assert "Standard Deviation: 2.3" in overall
+
+def test_print_report_with_all_users(mock_config, mock_github, capsys):
+    github_client, mock_org = mock_github
+    
+    # Create mock PRs
+    now = datetime.now(timezone.utc)
+    mock_closed_prs(mock_org, [
+        pr_node(1, now - timedelta(days=5), now - timedelta(days=1), 'user1'),
+        pr_node(2, now - timedelta(days=8), now - timedelta(days=2), 'user2'),
+    ])
     
     analyzer = ClosedPRAnalyzer(mock_config, days=28, user_login='all', github_client=github_client)
     report = analyzer.generate_report()
@@ -280,24 +377,13 @@ def test_invalid_config():
 
 def test_analyze_repo_with_debug_mode(mock_config, mock_github, capsys):
     github_client, mock_org = mock_github
-    repo = Mock()
-    mock_org.get_repo.return_value = repo
     
     # Create mock PRs
     now = datetime.now(timezone.utc)
-    pr1 = Mock()
-    pr1.number = 123
-    pr1.closed_at = now - timedelta(days=1)
-    pr1.created_at = now - timedelta(days=6)  # 5 days open
-    pr1.user.login = 'user1'
-    
-    pr2 = Mock()
-    pr2.number = 124
-    pr2.closed_at = now - timedelta(days=2)
-    pr2.created_at = now - timedelta(days=7)  # 5 days open
-    pr2.user.login = 'user2'
-    
-    repo.get_pulls.return_value = [pr1, pr2]
+    mock_closed_prs(mock_org, [
+        pr_node(123, now - timedelta(days=6), now - timedelta(days=1), 'user1'),  # 5 days open
+        pr_node(124, now - timedelta(days=7), now - timedelta(days=2), 'user2'),  # 5 days open
+    ])
     
     analyzer = ClosedPRAnalyzer(mock_config, days=28, debug=True, github_client=github_client)
     stats = analyzer.analyze_repo('repo1')
@@ -321,4 +407,21 @@ def test_analyze_repo_with_debug_mode(mock_config, mock_github, capsys):
     assert stats['repo_name'] == 'repo1'
     assert stats['total_closed'] == 2
     assert stats['avg_days_open'] == 5.0  # (5 + 5) / 2
-    assert stats['std_dev_days'] == 0.0  # Standard deviation of [5, 5] 
\ No newline at end of file
+    assert stats['std_dev_days'] == 0.0  # Standard deviation of [5, 5]
+
+def test_generate_report_debug_tables_do_not_interleave(mock_config, mock_github, capsys):
+    github_client, mock_org = mock_github
+    now = datetime.now(timezone.utc)
+    mock_closed_prs(mock_org, [
+        pr_node(123, now - timedelta(days=6), now - timedelta(days=1), 'user1'),
+        pr_node(124, now - timedelta(days=7), now - timedelta(days=2), 'user2'),
+    ])
+
+    ClosedPRAnalyzer(mock_config, days=28, debug=True, github_client=github_client).generate_report()
+
+    # Each repository's table is written as one block, rows included
+    tables = capsys.readouterr().out.split("Detailed PR Information for ")[1:]
+    assert sorted(table.split(':')[0] for table in tables) == ['repo1', 'repo2']
+    for table in tables:
+        rows = [line for line in table.splitlines() if line[:3] in ('123', '124')]
+        assert len(rows) == 2
@@ -1,9 +1,27 @@
 import pytest
 import os
 from datetime import datetime, timezone
-from db_manager import DatabaseManager, PRStats
+import db_manager as db_module
+from db_manager import DatabaseManager, PRStats, SCHEMA_VERSION, dumps_json, loads_json
 import sqlite3
 
+def make_stats(**overrides) -> PRStats:
+    """Build stats with placeholder values, overriding only the fields a test checks."""
+    fields = dict(
+        total_prs=5,
+        avg_age_days=2.5,
+        avg_age_days_excluding_oldest=2.0,
+        avg_comments=3.0,
+        avg_comments_with_comments=4.0,
+        approved_prs=2,
+        oldest_pr_age=10,
+        oldest_pr_title="Test PR",
+        prs_with_zero_comments=1,
+        reopened_prs=0
+    )
+    fields.update(overrides)
+    return PRStats(**fields)
+
 @pytest.fixture
 def db_manager():
     # Use a test database file
@@ -11,6 +29,7 @@ def db_manager():
     manager = DatabaseManager(test_db_path)
     yield manager
     # Clean up after tests
+    manager.close()
     if os.path.exists(test_db_path):
         os.remove(test_db_path)
 
@@ -208,4 +227,142 @@ def test_get_stats_for_date():
     
     # Test with non-existent repo
     stats = db.get_stats_for_date('nonexistent-repo', test_date)
-    assert stats is None 
\ No newline at end of file
+    assert stats is None 
+
+def test_etag_cache(db_manager):
+    assert db_manager.get_etag('/repos/org/repo/pulls') is None
+
+    db_manager.save_etag('/repos/org/repo/pulls', 'W/"abc"', '{"prs": []}')
+    assert db_manager.get_etag('/repos/org/repo/pulls') == ('W/"abc"', '{"prs": []}')
+
+    # Saving again replaces the cached entry
+    db_manager.save_etag('/repos/org/repo/pulls', 'W/"def"', '{"prs": [1]}')
+    assert db_manager.get_etag('/repos/org/repo/pulls') == ('W/"def"', '{"prs": [1]}')
+
+def test_save_stats_many(db_manager):
+    rows = [(repo_name, make_stats(total_prs=total)) for repo_name, total in [('repo1', 5), ('repo2', 7)]]
+    db_manager.save_stats_many(rows, '2024-03-21')
+
+    assert db_manager.get_stats_for_date('repo1', '2024-03-21')['total_prs'] == 5
+    assert db_manager.get_stats_for_date('repo2', '2024-03-21')['total_prs'] == 7
+
+def test_schema_version_skips_setup_when_current(db_manager, monkeypatch):
+    assert db_manager.conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+
+    # Reopening an up-to-date database must not touch the schema
+    def fail():
+        raise AssertionError("schema setup ran on a current database")
+    monkeypatch.setattr(DatabaseManager, '_create_tables', lambda self: fail())
+    monkeypatch.setattr(DatabaseManager, '_migrate_schema', lambda self: fail())
+    DatabaseManager(db_manager.db_path)
+
+def test_connection_pragmas(db_manager):
+    assert db_manager.conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+    assert db_manager.conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    assert db_manager.conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+
+    memory_db = DatabaseManager(':memory:')
+    assert memory_db.conn.execute("PRAGMA journal_mode").fetchone()[0] == 'memory'
+
+def test_latest_stats_seeks_the_primary_key(db_manager):
+    plan = db_manager.conn.execute(
+        "EXPLAIN QUERY PLAN SELECT date, total_prs, reopened_prs FROM pr_stats "
+        "WHERE repo_name = ? ORDER BY date DESC LIMIT 1", ('test-repo',)
+    ).fetchall()
+    assert 'USING PRIMARY KEY' in plan[0][3]
+    assert len(plan) == 1  # No separate sort step
+
+def test_rowid_table_is_rebuilt(tmp_path):
+    db_path = str(tmp_path / 'old.db')
+    with sqlite3.connect(db_path) as conn:
+        conn.execute('''
+            CREATE TABLE pr_stats (
+                repo_name TEXT,
+                date TEXT,
+                total_prs INTEGER,
+                avg_age_days REAL,
+                avg_comments REAL,
+                approved_prs INTEGER,
+                PRIMARY KEY (repo_name, date)
+            )
+        ''')
+        conn.execute("CREATE INDEX idx_repo_date ON pr_stats(repo_name, date DESC)")
+        conn.execute("INSERT INTO pr_stats VALUES ('test-repo', '2024-03-20', 5, 2.5, 3.0, 2)")
+    conn.close()
+
+    db = DatabaseManager(db_path)
+    table_sql = db.conn.execute("SELECT sql FROM sqlite_master WHERE name = 'pr_stats'").fetchone()[0]
+    assert 'WITHOUT ROWID' in table_sql
+    assert db.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND name = 'idx_repo_date'").fetchone() is None
+    stats = db.get_stats_for_date('test-repo', '2024-03-20')
+    assert stats['total_prs'] == 5
+    assert stats['reopened_prs'] == 0
+
+def test_connection_per_thread(db_manager):
+    from concurrent.futures import ThreadPoolExecutor
+
+    def connection_and_stats():
+        return db_manager.conn, db_manager.get_latest_stats('test-repo')
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        worker_conn, _ = executor.submit(connection_and_stats).result()
+    assert worker_conn is not db_manager.conn
+
+    # An in-memory database can only be reached through the connection that created it
+    memory_db = DatabaseManager(':memory:')
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        worker_conn, stats = executor.submit(lambda: (memory_db.conn, memory_db.get_latest_stats('test-repo'))).result()
+    assert worker_conn is memory_db.conn
+    assert stats is None
+
+def test_reads_do_not_open_transactions(db_manager):
+    db_manager.get_latest_stats('test-repo')
+    db_manager.save_etag('/repos/org/repo/pulls', 'W/"abc"', '{}')
+    assert not db_manager.conn.in_transaction
+
+    # Another connection sees the single-statement write without an explicit commit
+    with sqlite3.connect(db_manager.db_path) as other:
+        assert other.execute("SELECT etag FROM etags").fetchone() == ('W/"abc"',)
+    other.close()
+
+@pytest.mark.parametrize('use_orjson', [True, False])
+def test_json_payload_round_trip(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(db_module, 'orjson', None)
+    payload = {'since': '2024-03-20T00:00:00+00:00', 'prs': [{'number': 1, 'title': 'Fix ü'}]}
+
+    text = dumps_json(payload)
+
+    assert isinstance(text, str)
+    assert loads_json(text) == payload
+
+def test_stats_lookups_for_many_repos(db_manager):
+    db_manager.save_stats('repo1', make_stats(total_prs=1), date='2024-03-18')
+    db_manager.save_stats('repo1', make_stats(total_prs=2), date='2024-03-20')
+    db_manager.save_stats('repo1', make_stats(total_prs=3), date='2024-03-19')
+    db_manager.save_stats('repo2', make_stats(total_prs=4), date='2024-03-01')
+    db_manager.save_stats('repo3', make_stats(total_prs=5), date='2024-03-21')
+
+    latest = db_manager.get_latest_stats_many(['repo1', 'repo2', 'missing'])
+
+    assert set(latest) == {'repo1', 'repo2'}
+    assert (latest['repo1']['date'], latest['repo1']['total_prs']) == ('2024-03-20', 2)
+    assert (latest['repo2']['date'], latest['repo2']['total_prs']) == ('2024-03-01', 4)
+    assert latest['repo1'] == db_manager.get_latest_stats('repo1')
+    assert db_manager.get_latest_stats_many([]) == {}
+
+    before = db_manager.get_stats_before_date_many(['repo1', 'repo2', 'repo3'], datetime(2024, 3, 20, tzinfo=timezone.utc))
+    assert {name: row['date'] for name, row in before.items()} == {'repo1': '2024-03-19', 'repo2': '2024-03-01'}
+
+    earliest = db_manager.get_earliest_stats_many(['repo1', 'repo3'])
+    assert {name: row['date'] for name, row in earliest.items()} == {'repo1': '2024-03-18', 'repo3': '2024-03-21'}
+
+def test_daily_pr_counts(db_manager):
+    for date, total_prs in [('2024-03-18', 1), ('2024-03-20', 3), ('2024-03-19', 2), ('2024-03-25', 9)]:
+        db_manager.save_stats('repo1', make_stats(total_prs=total_prs), date=date)
+    start, end = datetime(2024, 3, 18, tzinfo=timezone.utc), datetime(2024, 3, 20, tzinfo=timezone.utc)
+
+    counts = db_manager.get_daily_pr_counts('repo1', start, end)
+
+    assert counts == [('2024-03-18', 1), ('2024-03-19', 2), ('2024-03-20', 3)]
+    assert counts == [(row['date'], row['total_prs']) for row in db_manager.get_stats_in_date_range('repo1', start, end)]
@@ -0,0 +1,203 @@
+import pytest
+import time
+from unittest.mock import Mock, patch
+from github import GithubException
+from github_api import GitHubRateLimiter, conditional_get, find_missing_repositories, graphql_query, iter_graphql_nodes
+
+def page(nodes, has_next_page=False, end_cursor=None):
+    return ({}, {
+        'data': {
+            'repository': {
+                'pullRequests': {
+                    'pageInfo': {'hasNextPage': has_next_page, 'endCursor': end_cursor},
+                    'nodes': nodes
+                }
+            }
+        }
+    })
+
+def test_graphql_query_returns_data():
+    requester = Mock()
+    requester.requestJsonAndCheck.return_value = ({}, {'data': {'viewer': {'login': 'me'}}})
+
+    data = graphql_query(requester, 'query { viewer { login } }')
+
+    assert data == {'viewer': {'login': 'me'}}
+    requester.requestJsonAndCheck.assert_called_once_with(
+        'POST', '/graphql', input={'query': 'query { viewer { login } }', 'variables': {}}
+    )
+
+def test_graphql_query_raises_on_errors():
+    requester = Mock()
+    requester.requestJsonAndCheck.return_value = ({}, {
+        'data': {'repository': None},
+        'errors': [{'message': "Could not resolve to a Repository with the name 'test-org/missing'."}]
+    })
+
+    with pytest.raises(ValueError, match="Could not resolve to a Repository"):
+        graphql_query(requester, 'query { repository { id } }')
+
+def test_iter_graphql_nodes_follows_cursors():
+    requester = Mock()
+    requester.requestJsonAndCheck.side_effect = [
+        page([{'number': 1}, {'number': 2}], has_next_page=True, end_cursor='abc'),
+        page([{'number': 3}]),
+    ]
+
+    nodes = list(iter_graphql_nodes(requester, 'query', {'owner': 'o'}, ('repository', 'pullRequests')))
+
+    assert [node['number'] for node in nodes] == [1, 2, 3]
+    second_call = requester.requestJsonAndCheck.call_args_list[1]
+    assert second_call.kwargs['input']['variables'] == {'owner': 'o', 'cursor': 'abc'}
+
+def test_iter_graphql_nodes_is_lazy():
+    requester = Mock()
+    requester.requestJsonAndCheck.side_effect = [
+        page([{'number': 1}], has_next_page=True, end_cursor='abc'),
+        page([{'number': 2}]),
+    ]
+
+    for node in iter_graphql_nodes(requester, 'query', {}, ('repository', 'pullRequests')):
+        break
+
+    assert requester.requestJsonAndCheck.call_count == 1
+
+def test_conditional_get_sends_etag():
+    requester = Mock()
+    requester.requestJson.return_value = (304, {'etag': 'W/"abc"'}, '')
+
+    status, etag = conditional_get(requester, '/repos/o/r/pulls', 'W/"abc"')
+
+    assert (status, etag) == (304, 'W/"abc"')
+    requester.requestJson.assert_called_once_with('GET', '/repos/o/r/pulls', headers={'If-None-Match': 'W/"abc"'})
+
+def test_conditional_get_without_etag():
+    requester = Mock()
+    requester.requestJson.return_value = (200, {'etag': 'W/"new"'}, '[]')
+
+    status, etag = conditional_get(requester, '/repos/o/r/pulls')
+
+    assert (status, etag) == (200, 'W/"new"')
+    requester.requestJson.assert_called_once_with('GET', '/repos/o/r/pulls', headers=None)
+
+def test_graphql_query_leaves_http_rate_limits_to_github_retry():
+    requester = Mock()
+    # PyGithub's GithubRetry has already retried the request when this reaches us
+    requester.requestJsonAndCheck.side_effect = GithubException(403, {'message': 'secondary rate limit'}, {'retry-after': '7'})
+
+    with patch('github_api.time.sleep') as sleep, pytest.raises(GithubException):
+        graphql_query(requester, 'query { viewer { login } }')
+
+    assert requester.requestJsonAndCheck.call_count == 1
+    sleep.assert_not_called()
+
+def test_graphql_query_retries_rate_limited_errors():
+    requester = Mock()
+    requester.requestJsonAndCheck.side_effect = [
+        ({}, {'data': None, 'errors': [{'type': 'RATE_LIMITED', 'message': 'API rate limit exceeded'}]}),
+        ({}, {'data': {'viewer': {'login': 'me'}}}),
+    ]
+
+    with patch('github_api.time.sleep'):
+        data = graphql_query(requester, 'query { viewer { login } }')
+
+    assert data == {'viewer': {'login': 'me'}}
+    assert requester.requestJsonAndCheck.call_count == 2
+
+def test_rate_limiter_gives_up_after_max_retries():
+    limiter = GitHubRateLimiter(max_retries=2)
+    request = Mock(return_value=({}, 'limited'))
+
+    with patch('github_api.time.sleep') as sleep:
+        headers, payload = limiter.call(request, lambda payload: True)
+
+    assert payload == 'limited'
+    assert request.call_count == 3
+    assert sleep.call_count == 2
+
+def test_rate_limiter_waits_for_reset_when_quota_is_spent():
+    limiter = GitHubRateLimiter()
+    reset = time.time() + 60
+    spent = {'x-ratelimit-remaining': '0', 'x-ratelimit-reset': str(reset)}
+
+    with patch('github_api.time.sleep') as sleep:
+        limiter.call(lambda: (spent, 'first'))
+        limiter.call(lambda: ({}, 'second'))
+
+    assert limiter.reset_at == {'core': reset}
+    assert sleep.call_count == 1
+    assert 0 < sleep.call_args.args[0] <= 60
+
+def test_rate_limiter_tracks_each_resource_separately():
+    limiter = GitHubRateLimiter()
+    spent = {'x-ratelimit-remaining': '0', 'x-ratelimit-reset': str(time.time() + 60), 'x-ratelimit-resource': 'core'}
+
+    with patch('github_api.time.sleep') as sleep:
+        limiter.call(lambda: (spent, 'rest'))
+        # A spent REST quota doesn't hold up GraphQL, which GitHub meters separately
+        limiter.call(lambda: ({}, 'graphql'), resource='graphql')
+        sleep.assert_not_called()
+        limiter.call(lambda: ({}, 'rest'))
+
+    assert sleep.call_count == 1
+
+def test_rate_limiter_does_not_retry_other_errors():
+    limiter = GitHubRateLimiter()
+    request = Mock(side_effect=GithubException(403, {'message': 'Resource not accessible by integration'}, {}))
+
+    with pytest.raises(GithubException):
+        limiter.call(request)
+
+    assert request.call_count == 1
+
+def test_iter_graphql_nodes_prefetches_next_page():
+    requester = Mock()
+    requester.requestJsonAndCheck.side_effect = [
+        page([{'number': 1}], has_next_page=True, end_cursor='abc'),
+        page([{'number': 2}]),
+    ]
+
+    nodes = iter_graphql_nodes(requester, 'query', {}, ('repository', 'pullRequests'), prefetch=True)
+    first = next(nodes)
+    # The second page is already on its way while the first page's nodes are consumed
+    for _ in range(100):
+        if requester.requestJsonAndCheck.call_count == 2:
+            break
+        time.sleep(0.01)
+
+    assert first == {'number': 1}
+    assert requester.requestJsonAndCheck.call_count == 2
+    assert list(nodes) == [{'number': 2}]
+
+def test_find_missing_repositories_in_one_request():
+    requester = Mock()
+    requester.requestJsonAndCheck.return_value = ({}, {
+        'data': {'repo0': {'id': 'R_1'}, 'repo1': None, 'repo2': {'id': 'R_3'}},
+        'errors': [{'type': 'NOT_FOUND', 'message': "Could not resolve to a Repository with the name 'o/missing'."}]
+    })
+
+    missing = find_missing_repositories(requester, 'o', ['api', 'missing', 'web'])
+
+    assert missing == ['missing']
+    requester.requestJsonAndCheck.assert_called_once()
+    variables = requester.requestJsonAndCheck.call_args.kwargs['input']['variables']
+    assert variables == {'owner': 'o', 'name0': 'api', 'name1': 'missing', 'name2': 'web'}
+
+def test_find_missing_repositories_raises_other_errors():
+    requester = Mock()
+    requester.requestJsonAndCheck.return_value = ({}, {
+        'data': None,
+        'errors': [{'type': 'FORBIDDEN', 'message': 'Resource not accessible by integration'}]
+    })
+
+    with pytest.raises(ValueError, match="Resource not accessible"):
+        find_missing_repositories(requester, 'o', ['api'])
+
+def test_iter_graphql_nodes_continues_after_cursor():
+    requester = Mock()
+    requester.requestJsonAndCheck.side_effect = [page([{'number': 2}])]
+
+    nodes = list(iter_graphql_nodes(requester, 'query', {'org': 'o'}, ('repository', 'pullRequests'), after='abc'))
+
+    assert nodes == [{'number': 2}]
+    assert requester.requestJsonAndCheck.call_args.kwargs['input']['variables'] == {'org': 'o', 'cursor': 'abc'}
@@ -1,10 +1,12 @@
 import pytest
 from datetime import datetime, timedelta, timezone
 from unittest.mock import Mock, patch
+from github import GithubException
 from pr_reporter import PRReporter, PRStats, PRDetail, PRNoUpdateDetail
 from pr_reporter import PRStats as ReporterPRStats
 from db_manager import PRStats as DBPRStats
 import os
+import yaml
 
 @pytest.fixture
 def mock_config():
@@ -17,25 +19,70 @@ def mock_config():
         }
     }
 
-@pytest.fixture
-def mock_pr():
+def pr_node(title, created_at, comments=0, labels=(), is_approved=False, updated_at=None,
+            is_draft=False, reopened=False, number=1, url=None):
+    """Build a pull request node as returned by the open PRs GraphQL query."""
+    return {
+        'number': number,
+        'title': title,
+        'url': url or f"https://github.com/test-org/test-repo/pull/{number}",
+        'createdAt': created_at.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'updatedAt': (updated_at or created_at).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'isDraft': is_draft,
+        'comments': {'totalCount': comments},
+        'labels': {'nodes': [{'name': name} for name in labels]},
+        'reviews': {'totalCount': 1 if is_approved else 0},
+        'timelineItems': {'totalCount': 1 if reopened else 0}
+    }
+
+def graphql_page(nodes):
+    """Wrap PR nodes in a single page of GraphQL results."""
+    return ({}, {
+        'data': {
+            'repository': {
+                'pullRequests': {
+                    'pageInfo': {'hasNextPage': False, 'endCursor': None},
+                    'nodes': nodes
+                }
+            }
+        }
+    })
+
+def mock_open_prs(mock_org, nodes):
+    """Serve the given nodes as every repository's open PRs."""
+    mock_org._requester.requestJson.return_value = (200, {}, '')
+    mock_org._requester.requestJsonAndCheck.return_value = graphql_page(nodes)
+
+def mock_open_prs_by_repo(mock_org, nodes_by_repo):
+    """Serve different open PRs for each repository."""
+    mock_org._requester.requestJson.return_value = (200, {}, '')
+    mock_org._requester.requestJsonAndCheck.side_effect = (
+        lambda *args, input: graphql_page(nodes_by_repo[input['variables']['name']])
+    )
+
+def rest_pr(created_at, comment_dates=(), comments_error=None):
+    """Build a REST pull request, fetched only to find its last comment."""
     pr = Mock()
-    pr.created_at = datetime.now(timezone.utc) - timedelta(days=5)
-    pr.comments = 3
-    pr.get_reviews.return_value = []
-    pr.labels = []  # Ensure labels is always a list
+    pr.created_at = created_at
+    if comments_error:
+        pr.get_issue_comments.side_effect = comments_error
+    else:
+        pr.get_issue_comments.return_value = [Mock(created_at=date) for date in comment_dates]
+    pr.get_review_comments.return_value = []
+    pr.get_commits.return_value = []
     return pr
 
+def mock_rest_prs(github_client, prs_by_number):
+    """Serve REST pull requests by number."""
+    github_client.get_repo.return_value.get_pull.side_effect = lambda number: prs_by_number[number]
+
+@pytest.fixture
+def mock_pr():
+    return pr_node("Test PR", datetime.now(timezone.utc) - timedelta(days=5), comments=3)
+
 @pytest.fixture
 def mock_approved_pr():
-    pr = Mock()
-    pr.created_at = datetime.now(timezone.utc) - timedelta(days=2)
-    pr.comments = 5
-    review = Mock()
-    review.state = 'APPROVED'
-    pr.get_reviews.return_value = [review]
-    pr.labels = []  # Ensure labels is always a list
-    return pr
+    return pr_node("Approved PR", datetime.now(timezone.utc) - timedelta(days=2), comments=5, is_approved=True, number=2)
 
 @pytest.fixture
 def mock_github():
@@ -48,34 +95,12 @@ def mock_github():
 @pytest.fixture
 def mock_db():
     with patch('pr_reporter.DatabaseManager') as mock:
+        mock.return_value.get_etag.return_value = None
         yield mock
 
-# Helper for label mocks
-def label_mock(label_name):
-    mock = Mock()
-    mock.name = label_name
-    return mock
-
-def create_mock_pr(title, created_at, comments=0, labels=None, is_approved=False):
-    mock_pr = Mock()
-    mock_pr.title = title
-    mock_pr.created_at = created_at
-    mock_pr.comments = comments
-    mock_pr.labels = labels or []
-    mock_pr.html_url = f"https://github.com/test-org/test-repo/pull/1"
-    
-    # Mock reviews
-    mock_review = Mock()
-    mock_review.state = 'APPROVED' if is_approved else 'COMMENTED'
-    mock_pr.get_reviews.return_value = [mock_review] if is_approved else []
-    
-    return mock_pr
-
 def test_empty_repo(mock_config, mock_github, mock_db):
     github_client, mock_org = mock_github
-    mock_repo = Mock()
-    mock_repo.get_pulls.return_value = []
-    mock_org.get_repo.return_value = mock_repo
+    mock_open_prs(mock_org, [])
 
     reporter = PRReporter(mock_config, verbose=True, min_age_days=5, github_client=github_client)
     stats = reporter.get_repo_stats('repo1')
@@ -93,12 +118,7 @@ def test_empty_repo(mock_config, mock_github, mock_db):
 
 def test_repo_with_prs(mock_config, mock_github, mock_db, mock_pr, mock_approved_pr):
     github_client, mock_org = mock_github
-    mock_repo = Mock()
-    # Ensure labels attribute is present
-    mock_pr.labels = []
-    mock_approved_pr.labels = []
-    mock_repo.get_pulls.return_value = [mock_pr, mock_approved_pr]
-    mock_org.get_repo.return_value = mock_repo
+    mock_open_prs(mock_org, [mock_pr, mock_approved_pr])
 
     reporter = PRReporter(mock_config, verbose=True, min_age_days=5, github_client=github_client)
     stats = reporter.get_repo_stats('repo1')
@@ -110,48 +130,101 @@ def test_repo_with_prs(mock_config, mock_github, mock_db, mock_pr, mock_approved
     assert stats.avg_comments_with_comments == 4  # Average of 3 and 5 comments (both have comments)
     assert stats.approved_prs == 1
     assert stats.oldest_pr_age == 5  # The older PR is 5 days old
-    assert stats.oldest_pr_title == mock_pr.title
+    assert stats.oldest_pr_title == mock_pr['title']
     assert stats.prs_with_zero_comments == 0  # Both PRs have comments
     assert stats.zero_comment_prs == []  # No PRs without comments
 
     # Verify database save was called
     mock_db.return_value.save_stats.assert_called_once_with('repo1', stats)
 
+def test_repo_stats_from_one_query(mock_config, mock_github, mock_db, mock_pr):
+    github_client, mock_org = mock_github
+    now = datetime.now(timezone.utc)
+    mock_open_prs(mock_org, [mock_pr, pr_node("Reopened PR", now - timedelta(days=3), reopened=True, number=2)])
+
+    reporter = PRReporter(mock_config, github_client=github_client)
+    stats = reporter.get_repo_stats('repo1')
+
+    assert stats.reopened_prs == 1
+    # Comments, reviews, labels and reopen events all come with the listing
+    mock_org._requester.requestJsonAndCheck.assert_called_once()
+    variables = mock_org._requester.requestJsonAndCheck.call_args.kwargs['input']['variables']
+    # Labels are only needed for the verbose listing and --noupdate
+    assert variables == {'owner': 'test-org', 'name': 'repo1', 'cursor': None, 'withLabels': False}
+    github_client.get_repo.assert_not_called()
+
+def test_labels_selected_when_needed(mock_config, mock_github, mock_db, mock_pr):
+    github_client, mock_org = mock_github
+    mock_open_prs(mock_org, [mock_pr])
+
+    PRReporter(mock_config, no_update_days=7, github_client=github_client).get_repo_stats('repo1')
+
+    query_input = mock_org._requester.requestJsonAndCheck.call_args.kwargs['input']
+    assert query_input['variables']['withLabels'] is True
+    # As many labels as one page allows, so a DO NOT MERGE label isn't missed on busy PRs
+    assert 'labels(first: 100)' in query_input['query']
+
+def test_open_prs_reused_when_listing_unchanged(mock_config, mock_github, mock_db, mock_pr):
+    github_client, mock_org = mock_github
+    mock_open_prs(mock_org, [mock_pr])
+    mock_org._requester.requestJson.return_value = (200, {'etag': 'W/"abc"'}, '[]')
+    saved = {}
+    mock_db.return_value.save_etag.side_effect = lambda key, etag, payload: saved.update({key: (etag, payload)})
+    mock_db.return_value.get_etag.side_effect = saved.get
+
+    first = PRReporter(mock_config, github_client=github_client).get_repo_stats('repo1')
+
+    # Nothing changed, so the second run must not query GraphQL
+    mock_org._requester.requestJson.return_value = (304, {'etag': 'W/"abc"'}, '')
+    second = PRReporter(mock_config, github_client=github_client).get_repo_stats('repo1')
+
+    assert mock_org._requester.requestJsonAndCheck.call_count == 1
+    assert mock_org._requester.requestJson.call_args.kwargs['headers'] == {'If-None-Match': 'W/"abc"'}
+    assert second == first
+
+def test_repo_stats_memoized_within_ttl(mock_config, mock_github, mock_db, mock_pr):
+    github_client, mock_org = mock_github
+    mock_open_prs(mock_org, [mock_pr])
+
+    reporter = PRReporter(mock_config, github_client=github_client)
+    with patch('pr_reporter.time.monotonic', return_value=1000.0):
+        first = reporter.get_repo_stats('repo1')
+    # Reused for the full TTL after the fetch, not just until a wall-clock boundary
+    with patch('pr_reporter.time.monotonic', return_value=1000.0 + 299):
+        second = reporter.get_repo_stats('repo1')
+    assert second is first
+    assert mock_org._requester.requestJsonAndCheck.call_count == 1
+
+    with patch('pr_reporter.time.monotonic', return_value=1000.0 + 300):
+        reporter.get_repo_stats('repo1')
+    assert mock_org._requester.requestJsonAndCheck.call_count == 2
+
+def test_repo_stats_cache_disabled_with_zero_ttl(mock_config, mock_github, mock_db, mock_pr):
+    github_client, mock_org = mock_github
+    mock_open_prs(mock_org, [mock_pr])
+    mock_config['github']['cache_ttl_seconds'] = 0
+
+    reporter = PRReporter(mock_config, github_client=github_client)
+    reporter.get_repo_stats('repo1')
+    reporter.get_repo_stats('repo1')
+
+    assert mock_org._requester.requestJsonAndCheck.call_count == 2
+
 def test_generate_report(mock_config, mock_github, mock_db, mock_pr):
     github_client, mock_org = mock_github
+    now = datetime.now(timezone.utc)
     
-    # Create different mock repositories with different PR counts
-    mock_repo1 = Mock()
-    mock_pr.labels = []
-    mock_repo1.get_pulls.return_value = [mock_pr]  # 1 PR
-    
-    # Create two PRs with different ages and comment counts
-    mock_pr_old = Mock()
-    mock_pr_old.created_at = datetime.now(timezone.utc) - timedelta(days=10)
-    mock_pr_old.comments = 0  # No comments
-    mock_pr_old.get_reviews.return_value = []
-    mock_pr_old.title = "Old PR"
-    mock_pr_old.html_url = "https://github.com/test-org/repo2/pull/1"
-    mock_pr_old.labels = [label_mock("Ready for Review")]
-
-    mock_pr_new = Mock()
-    mock_pr_new.created_at = datetime.now(timezone.utc) - timedelta(days=3)
-    mock_pr_new.comments = 6  # 6 comments
-    mock_pr_new.get_reviews.return_value = []
-    mock_pr_new.title = "New PR"
-    mock_pr_new.html_url = "https://github.com/test-org/repo2/pull/2"
-    mock_pr_new.labels = [label_mock("Ready for Review")]
-    
-    mock_repo2 = Mock()
-    mock_repo2.get_pulls.return_value = [mock_pr_old, mock_pr_new]  # 2 PRs with different ages
-    
-    # Return different repos based on the repo name
-    def get_repo(name):
-        if name == 'repo1':
-            return mock_repo1
-        return mock_repo2
-    
-    mock_org.get_repo.side_effect = get_repo
+    # Different repositories with different PR counts
+    mock_open_prs_by_repo(mock_org, {
+        'repo1': [mock_pr],  # 1 PR
+        # Two PRs with different ages and comment counts
+        'repo2': [
+            pr_node("Old PR", now - timedelta(days=10), comments=0, labels=["Ready for Review"],
+                    number=1, url="https://github.com/test-org/repo2/pull/1"),
+            pr_node("New PR", now - timedelta(days=3), comments=6, labels=["Ready for Review"],
+                    number=2, url="https://github.com/test-org/repo2/pull/2"),
+        ]
+    })
 
     reporter = PRReporter(mock_config, verbose=True, min_age_days=5, github_client=github_client)
     report = reporter.generate_report()
@@ -163,7 +236,7 @@ def test_generate_report(mock_config, mock_github, mock_db, mock_pr):
     assert report['repo2'].total_prs == 2
     assert report['repo1'].oldest_pr_age == 5  # The PR is 5 days old
     assert report['repo2'].oldest_pr_age == 10  # The older PR is 10 days old
-    assert report['repo1'].oldest_pr_title == mock_pr.title
+    assert report['repo1'].oldest_pr_title == mock_pr['title']
     assert report['repo2'].oldest_pr_title == "Old PR"
     assert report['repo1'].avg_age_days_excluding_oldest == 0  # No other PRs
     assert report['repo2'].avg_age_days_excluding_oldest == 3  # Only the 3-day old PR
@@ -183,16 +256,13 @@ def test_generate_report(mock_config, mock_github, mock_db, mock_pr):
     assert zero_comment_pr.age_days == 10
     assert zero_comment_pr.url == "https://github.com/test-org/repo2/pull/1"
     
-    # Verify database save was called for each repo
-    assert mock_db.return_value.save_stats.call_count == 2
+    # Verify all repos were saved together in one batch
+    mock_db.return_value.save_stats.assert_not_called()
+    mock_db.return_value.save_stats_many.assert_called_once_with([('repo1', report['repo1']), ('repo2', report['repo2'])])
 
-def test_non_verbose_mode(mock_config, mock_github, mock_db, mock_pr):
+def test_non_verbose_mode(mock_config, mock_github, mock_db):
     github_client, mock_org = mock_github
-    mock_repo = Mock()
-    mock_pr.comments = 0  # Make the PR have no comments
-    mock_pr.labels = []
-    mock_repo.get_pulls.return_value = [mock_pr]
-    mock_org.get_repo.return_value = mock_repo
+    mock_open_prs(mock_org, [pr_node("Test PR", datetime.now(timezone.utc) - timedelta(days=5), comments=0)])
 
     reporter = PRReporter(mock_config, verbose=False, min_age_days=5, github_client=github_client)
     stats = reporter.get_repo_stats('repo1')
@@ -203,35 +273,14 @@ def test_non_verbose_mode(mock_config, mock_github, mock_db, mock_pr):
 
 def test_min_age_filter(mock_config, mock_github, mock_db):
     github_client, mock_org = mock_github
-    mock_repo = Mock()
-    
-    # Create PRs with different ages and no comments
-    mock_pr_old = Mock()
-    mock_pr_old.created_at = datetime.now(timezone.utc) - timedelta(days=10)
-    mock_pr_old.comments = 0
-    mock_pr_old.get_reviews.return_value = []
-    mock_pr_old.title = "Old PR"
-    mock_pr_old.html_url = "https://github.com/test-org/repo/pull/1"
-    mock_pr_old.labels = [label_mock("Ready for Review")]
-
-    mock_pr_medium = Mock()
-    mock_pr_medium.created_at = datetime.now(timezone.utc) - timedelta(days=5)
-    mock_pr_medium.comments = 0
-    mock_pr_medium.get_reviews.return_value = []
-    mock_pr_medium.title = "Medium PR"
-    mock_pr_medium.html_url = "https://github.com/test-org/repo/pull/2"
-    mock_pr_medium.labels = [label_mock("Ready for Review")]
-
-    mock_pr_new = Mock()
-    mock_pr_new.created_at = datetime.now(timezone.utc) - timedelta(days=2)
-    mock_pr_new.comments = 0
-    mock_pr_new.get_reviews.return_value = []
-    mock_pr_new.title = "New PR"
-    mock_pr_new.html_url = "https://github.com/test-org/repo/pull/3"
-    mock_pr_new.labels = [label_mock("Ready for Review")]
-    
-    mock_repo.get_pulls.return_value = [mock_pr_old, mock_pr_medium, mock_pr_new]
-    mock_org.get_repo.return_value = mock_repo
+    now = datetime.now(timezone.utc)
+    
+    # PRs with different ages and no comments
+    mock_open_prs(mock_org, [
+        pr_node("Old PR", now - timedelta(days=10), labels=["Ready for Review"], number=1),
+        pr_node("Medium PR", now - timedelta(days=5), labels=["Ready for Review"], number=2),
+        pr_node("New PR", now - timedelta(days=2), labels=["Ready for Review"], number=3),
+    ])
 
     # Test with minimum age of 5 days
     reporter = PRReporter(mock_config, verbose=True, min_age_days=5, github_client=github_client)
@@ -244,18 +293,30 @@ def test_min_age_filter(mock_config, mock_github, mock_db):
     assert stats.zero_comment_prs[1].title == "Medium PR"  # 5 days old
     assert "New PR" not in [pr.title for pr in stats.zero_comment_prs]  # 2 days old, should be filtered out
 
-    print("Debug: PR labels:")
-    for pr in [mock_pr_old, mock_pr_medium, mock_pr_new]:
-        print(f"PR {pr.title} labels: {[label.name for label in pr.labels]}")
+def test_top_zero_keeps_oldest_prs(mock_config, mock_github, mock_db):
+    github_client, mock_org = mock_github
+    now = datetime.now(timezone.utc)
+    mock_open_prs(mock_org, [
+        pr_node(f"PR {age}", now - timedelta(days=age), labels=["Ready for Review"], number=age)
+        for age in (3, 12, 7, 9)
+    ])
 
-def test_get_repo_stats_no_prs(mock_config):
-    mock_repo = Mock()
-    mock_repo.get_pulls.return_value = []
+    reporter = PRReporter(mock_config, verbose=True, top_zero=2, github_client=github_client)
+    stats = reporter.get_repo_stats('repo1')
+
+    assert stats.prs_with_zero_comments == 4  # The count still covers every PR
+    assert [pr.title for pr in stats.zero_comment_prs] == ["PR 12", "PR 9"]
+
+def reporter_with_prs(mock_config, nodes, **kwargs):
+    """Build a reporter whose GitHub organization serves the given open PRs."""
     github_client = Mock()
     org = Mock()
     github_client.get_organization.return_value = org
-    org.get_repo.return_value = mock_repo
-    reporter = PRReporter(mock_config, github_client=github_client)
+    mock_open_prs(org, nodes)
+    return PRReporter(mock_config, github_client=github_client, **kwargs)
+
+def test_get_repo_stats_no_prs(mock_config):
+    reporter = reporter_with_prs(mock_config, [])
     stats = reporter.get_repo_stats('test-repo')
     
     assert stats.total_prs == 0
@@ -267,17 +328,11 @@ def test_get_repo_stats_no_prs(mock_config):
 def test_get_repo_stats_with_prs(mock_config):
     now = datetime.now(timezone.utc)
     prs = [
-        create_mock_pr("PR 1", now - timedelta(days=5), comments=2, labels=[label_mock("Ready for Review")]),
-        create_mock_pr("PR 2", now - timedelta(days=10), comments=0, labels=[label_mock("Ready for Review")]),
-        create_mock_pr("PR 3", now - timedelta(days=15), comments=3, labels=[label_mock("Ready for Review")], is_approved=True)
+        pr_node("PR 1", now - timedelta(days=5), comments=2, labels=["Ready for Review"], number=1),
+        pr_node("PR 2", now - timedelta(days=10), comments=0, labels=["Ready for Review"], number=2),
+        pr_node("PR 3", now - timedelta(days=15), comments=3, labels=["Ready for Review"], is_approved=True, number=3)
     ]
-    mock_repo = Mock()
-    mock_repo.get_pulls.return_value = prs
-    github_client = Mock()
-    org = Mock()
-    github_client.get_organization.return_value = org
-    org.get_repo.return_value = mock_repo
-    reporter = PRReporter(mock_config, verbose=True, github_client=github_client)
+    reporter = reporter_with_prs(mock_config, prs, verbose=True)
     stats = reporter.get_repo_stats('test-repo')
     
     assert stats.total_prs == 3
@@ -291,16 +346,10 @@ def test_get_repo_stats_with_prs(mock_config):
 def test_get_repo_stats_without_ready_label(mock_config):
     now = datetime.now(timezone.utc)
     prs = [
-        create_mock_pr("PR 1", now - timedelta(days=5), comments=0, labels=[label_mock("WIP")]),
-        create_mock_pr("PR 2", now - timedelta(days=10), comments=0, labels=[label_mock("Ready for Review")]),
+        pr_node("PR 1", now - timedelta(days=5), comments=0, labels=["WIP"], number=1),
+        pr_node("PR 2", now - timedelta(days=10), comments=0, labels=["Ready for Review"], number=2),
     ]
-    mock_repo = Mock()
-    mock_repo.get_pulls.return_value = prs
-    github_client = Mock()
-    org = Mock()
-    github_client.get_organization.return_value = org
-    org.get_repo.return_value = mock_repo
-    reporter = PRReporter(mock_config, verbose=True, github_client=github_client)
+    reporter = reporter_with_prs(mock_config, prs, verbose=True)
     stats = reporter.get_repo_stats('test-repo')
     
     assert stats.total_prs == 2
@@ -311,16 +360,10 @@ def test_get_repo_stats_without_ready_label(mock_config):
 def test_get_repo_stats_with_min_age(mock_config):
     now = datetime.now(timezone.utc)
     prs = [
-        create_mock_pr("PR 1", now - timedelta(days=3), comments=0, labels=[label_mock("Ready for Review")]),
-        create_mock_pr("PR 2", now - timedelta(days=7), comments=0, labels=[label_mock("Ready for Review")]),
+        pr_node("PR 1", now - timedelta(days=3), comments=0, labels=["Ready for Review"], number=1),
+        pr_node("PR 2", now - timedelta(days=7), comments=0, labels=["Ready for Review"], number=2),
     ]
-    mock_repo = Mock()
-    mock_repo.get_pulls.return_value = prs
-    github_client = Mock()
-    org = Mock()
-    github_client.get_organization.return_value = org
-    org.get_repo.return_value = mock_repo
-    reporter = PRReporter(mock_config, verbose=True, min_age_days=5, github_client=github_client)
+    reporter = reporter_with_prs(mock_config, prs, verbose=True, min_age_days=5)
     stats = reporter.get_repo_stats('test-repo')
     
     assert stats.total_prs == 2
@@ -331,18 +374,10 @@ def test_get_repo_stats_with_min_age(mock_config):
 def test_get_repo_stats_with_multiple_labels(mock_config):
     now = datetime.now(timezone.utc)
     prs = [
-        create_mock_pr("PR 1", now - timedelta(days=5), comments=0, 
-                      labels=[label_mock("Ready for Review"), label_mock("Enhancement")]),
-        create_mock_pr("PR 2", now - timedelta(days=7), comments=0, 
-                      labels=[label_mock("WIP"), label_mock("Bug")]),
+        pr_node("PR 1", now - timedelta(days=5), comments=0, labels=["Ready for Review", "Enhancement"], number=1),
+        pr_node("PR 2", now - timedelta(days=7), comments=0, labels=["WIP", "Bug"], number=2),
     ]
-    mock_repo = Mock()
-    mock_repo.get_pulls.return_value = prs
-    github_client = Mock()
-    org = Mock()
-    github_client.get_organization.return_value = org
-    org.get_repo.return_value = mock_repo
-    reporter = PRReporter(mock_config, verbose=True, github_client=github_client)
+    reporter = reporter_with_prs(mock_config, prs, verbose=True)
     stats = reporter.get_repo_stats('test-repo')
     
     assert stats.total_prs == 2
@@ -350,6 +385,23 @@ def test_get_repo_stats_with_multiple_labels(mock_config):
     assert len(stats.zero_comment_prs) == 1  # Only shows PR with "Ready for Review" label
     assert stats.zero_comment_prs[0].title == "PR 1"
 
+def test_get_repo_stats_excludes_only_one_oldest_pr(mock_config):
+    now = datetime.now(timezone.utc)
+    prs = [
+        pr_node("PR 1", now - timedelta(days=10), comments=1, number=1),
+        pr_node("PR 2", now - timedelta(days=4), comments=0, number=2),
+        pr_node("PR 3", now - timedelta(days=10), comments=5, number=3),
+    ]
+    reporter = reporter_with_prs(mock_config, prs)
+    stats = reporter.get_repo_stats('test-repo')
+
+    assert stats.avg_age_days == 8
+    assert stats.avg_age_days_excluding_oldest == 7  # The other 10-day PR still counts
+    assert stats.oldest_pr_title == "PR 1"
+    assert stats.avg_comments == 2
+    assert stats.avg_comments_with_comments == 3
+    assert stats.prs_with_zero_comments == 1
+
 def test_format_comparison(mock_config):
     with patch('pr_reporter.Github') as mock_github:
         mock_github.return_value = Mock()
@@ -411,44 +463,33 @@ def test_get_comparison_stats_no_data(mock_config):
             stats = reporter._get_comparison_stats('test-repo')
             assert stats is None
 
+def test_get_comparison_stats_many(mock_config):
+    github_client = Mock()
+    reporter = PRReporter(mock_config, compare_days=7, github_client=github_client)
+    before = {'repo1': {'date': '2024-03-19', 'total_prs': 5}}
+    earliest = {'repo2': {'date': '2024-03-25', 'total_prs': 2}}
+    with patch.object(reporter.db, 'get_stats_before_date_many', return_value=before) as get_before, \
+         patch.object(reporter.db, 'get_earliest_stats_many', return_value=earliest) as get_earliest:
+        stats = reporter._get_comparison_stats_many(['repo1', 'repo2'])
+
+    assert stats == {'repo1': {'date': '2024-03-19', 'total_prs': 5.0}, 'repo2': {'date': '2024-03-25', 'total_prs': 2.0}}
+    get_before.assert_called_once()
+    # Only the repository without older stats falls back to its earliest stats
+    get_earliest.assert_called_once_with(['repo2'])
+
 def test_graph_generation_single_repo(mock_config, mock_github, mock_db):
     github_client, mock_org = mock_github
     reporter = PRReporter(mock_config, github_client=github_client)
     
     # Mock database response for a single repository
-    mock_stats = [
-        {
-            'date': '2024-03-19',
-            'total_prs': 5,
-            'avg_age_days': 7.2,
-            'avg_age_days_excluding_oldest': 5.1,
-            'avg_comments': 3.4,
-            'avg_comments_with_comments': 4.2,
-            'approved_prs': 1,
-            'oldest_pr_age': 15,
-            'oldest_pr_title': 'Test PR',
-            'prs_with_zero_comments': 2
-        },
-        {
-            'date': '2024-03-20',
-            'total_prs': 6,
-            'avg_age_days': 7.5,
-            'avg_age_days_excluding_oldest': 5.3,
-            'avg_comments': 3.6,
-            'avg_comments_with_comments': 4.4,
-            'approved_prs': 2,
-            'oldest_pr_age': 16,
-            'oldest_pr_title': 'Test PR 2',
-            'prs_with_zero_comments': 1
-        }
-    ]
+    mock_counts = [('2024-03-19', 5), ('2024-03-20', 6)]
     
-    with patch.object(reporter.db, 'get_stats_in_date_range', return_value=mock_stats):
+    with patch.object(reporter.db, 'get_daily_pr_counts', return_value=mock_counts):
         reporter.generate_graph(days=2, repo_name='repo1')
         
         # Verify database was queried with correct parameters
-        reporter.db.get_stats_in_date_range.assert_called_once()
-        call_args = reporter.db.get_stats_in_date_range.call_args[0]
+        reporter.db.get_daily_pr_counts.assert_called_once()
+        call_args = reporter.db.get_daily_pr_counts.call_args[0]
         assert call_args[0] == 'repo1'  # repo_name
         assert isinstance(call_args[1], datetime)  # start_date
         assert isinstance(call_args[2], datetime)  # end_date
@@ -458,29 +499,41 @@ def test_graph_generation_all_repos(mock_config, mock_github, mock_db):
     reporter = PRReporter(mock_config, github_client=github_client)
     
     # Mock database response for multiple repositories
-    mock_stats = {
-        'repo1': [
-            {'date': '2024-03-19', 'total_prs': 5},
-            {'date': '2024-03-20', 'total_prs': 6}
-        ],
-        'repo2': [
-            {'date': '2024-03-19', 'total_prs': 3},
-            {'date': '2024-03-20', 'total_prs': 4}
-        ]
+    mock_counts = {
+        'repo1': [('2024-03-19', 5), ('2024-03-20', 6)],
+        'repo2': [('2024-03-19', 3), ('2024-03-20', 4)]
     }
     
-    def mock_get_stats(repo_name, start_date, end_date):
-        return mock_stats.get(repo_name, [])
+    def mock_get_counts(repo_name, start_date, end_date):
+        return mock_counts.get(repo_name, [])
     
-    with patch.object(reporter.db, 'get_stats_in_date_range', side_effect=mock_get_stats):
+    with patch.object(reporter.db, 'get_daily_pr_counts', side_effect=mock_get_counts):
         reporter.generate_graph(days=2)
         
         # Verify database was queried for each repository
-        assert reporter.db.get_stats_in_date_range.call_count == 2
-        calls = reporter.db.get_stats_in_date_range.call_args_list
+        assert reporter.db.get_daily_pr_counts.call_count == 2
+        calls = reporter.db.get_daily_pr_counts.call_args_list
         assert calls[0][0][0] == 'repo1'  # First call for repo1
         assert calls[1][0][0] == 'repo2'  # Second call for repo2
 
+def test_graph_generation_reuses_axes(mock_config, mock_github, mock_db):
+    import matplotlib.pyplot as plt
+    github_client, mock_org = mock_github
+    reporter = PRReporter(mock_config, github_client=github_client)
+    fig, ax = plt.subplots()
+    mock_counts = [('2024-03-19', 5), ('2024-03-20', 6)]
+
+    with patch.object(reporter.db, 'get_daily_pr_counts', return_value=mock_counts), \
+         patch('pr_reporter.plt.subplots') as subplots:
+        reporter.generate_graph(days=2, repo_name='repo1', ax=ax)
+        reporter.generate_graph(days=2, repo_name='repo2', ax=ax)
+
+    subplots.assert_not_called()
+    # The axes are cleared between graphs rather than accumulating lines
+    assert [line.get_label() for line in ax.get_lines()] == ['repo2']
+    assert plt.fignum_exists(fig.number)
+    plt.close(fig)
+
 def test_graph_generation_invalid_repo(mock_config, mock_github, mock_db):
     github_client, mock_org = mock_github
     reporter = PRReporter(mock_config, github_client=github_client)
@@ -494,27 +547,13 @@ def test_graph_generation_filename_format(mock_config, mock_github, mock_db):
     reporter = PRReporter(mock_config, github_client=github_client)
     
     # Mock database response
-    mock_stats = [
-        {
-            'date': '2024-03-19',
-            'total_prs': 5,
-            'avg_age_days': 7.2,
-            'avg_age_days_excluding_oldest': 5.1,
-            'avg_comments': 3.4,
-            'avg_comments_with_comments': 4.2,
-            'approved_prs': 1,
-            'oldest_pr_age': 15,
-            'oldest_pr_title': 'Test PR',
-            'prs_with_zero_comments': 2
-        }
-    ]
+    mock_counts = [('2024-03-19', 5)]
     
     # Mock datetime.now to return a fixed date
     with patch('pr_reporter.datetime') as mock_datetime:
         mock_datetime.now.return_value = datetime(2024, 3, 21, tzinfo=timezone.utc)
-        mock_datetime.strptime = datetime.strptime  # Keep the original strptime
         
-        with patch.object(reporter.db, 'get_stats_in_date_range', return_value=mock_stats):
+        with patch.object(reporter.db, 'get_daily_pr_counts', return_value=mock_counts):
             # Test single repo graph
             filepath = reporter.generate_graph(days=2, repo_name='repo1')
             assert filepath == 'graphs/repo1_pr_trends_2024-03-21.png'
@@ -582,90 +621,48 @@ def test_dbonly_mode_github_not_initialized(mock_config, mock_github, mock_db):
     assert not hasattr(reporter, 'github')
     assert not hasattr(reporter, 'org') 
 
+def test_config_file_is_parsed_once(tmp_path, mock_config, mock_github, mock_db):
+    github_client, _ = mock_github
+    config_path = tmp_path / 'config.yaml'
+    config_path.write_text(yaml.safe_dump(mock_config))
+
+    with patch('pr_reporter.yaml.load', wraps=yaml.load) as load:
+        first = PRReporter(str(config_path), github_client=github_client)
+        first.config['github']['repos'].append('mutated')
+        second = PRReporter(str(config_path), github_client=github_client)
+        assert load.call_count == 1
+        assert second.config == mock_config  # Callers get their own copy
+
+        # A changed file is parsed again
+        mock_config['github']['repos'].append('repo3')
+        config_path.write_text(yaml.safe_dump(mock_config))
+        third = PRReporter(str(config_path), github_client=github_client)
+        assert load.call_count == 2
+        assert third.config['github']['repos'] == ['repo1', 'repo2', 'repo3']
+
 def test_no_update_functionality(mock_config, mock_github, mock_db):
     """Test the new no-update functionality that finds PRs with no recent comments."""
     github_client, mock_org = mock_github
-    mock_repo = Mock()
-    
-    # Create PRs with different comment histories
     now = datetime.now(timezone.utc)
     
-    # PR with recent comment (2 days ago)
-    mock_pr_recent = Mock()
-    mock_pr_recent.created_at = now - timedelta(days=10)
-    mock_pr_recent.comments = 5
-    mock_pr_recent.title = "Recent Comment PR"
-    mock_pr_recent.html_url = "https://github.com/test-org/repo/pull/1"
-    mock_pr_recent.labels = []
-    mock_pr_recent.get_reviews.return_value = []
-    
-    # PR with old comment (15 days ago)
-    mock_pr_old_comment = Mock()
-    mock_pr_old_comment.created_at = now - timedelta(days=20)
-    mock_pr_old_comment.comments = 3
-    mock_pr_old_comment.title = "Old Comment PR"
-    mock_pr_old_comment.html_url = "https://github.com/test-org/repo/pull/2"
-    mock_pr_old_comment.labels = []
-    mock_pr_old_comment.get_reviews.return_value = []
-    
-    # PR with no comments
-    mock_pr_no_comments = Mock()
-    mock_pr_no_comments.created_at = now - timedelta(days=5)
-    mock_pr_no_comments.comments = 0
-    mock_pr_no_comments.title = "No Comments PR"
-    mock_pr_no_comments.html_url = "https://github.com/test-org/repo/pull/3"
-    mock_pr_no_comments.labels = []
-    mock_pr_no_comments.get_reviews.return_value = []
-    
-    mock_repo.get_pulls.return_value = [mock_pr_recent, mock_pr_old_comment, mock_pr_no_comments]
-    mock_org.get_repo.return_value = mock_repo
-    
-    # Mock the comment dates
-    def mock_get_issue_comments():
-        if mock_pr_recent:
-            # Recent comment (2 days ago)
-            comment1 = Mock()
-            comment1.created_at = now - timedelta(days=2)
-            comment2 = Mock()
-            comment2.created_at = now - timedelta(days=5)
-            return [comment1, comment2]
-        elif mock_pr_old_comment:
-            # Old comment (15 days ago)
-            comment = Mock()
-            comment.created_at = now - timedelta(days=15)
-            return [comment]
-        else:
-            # No comments
-            return []
-    
-    # Set up the mock for get_issue_comments
-    mock_pr_recent.get_issue_comments.return_value = [
-        Mock(created_at=now - timedelta(days=2)),
-        Mock(created_at=now - timedelta(days=5))
-    ]
-    mock_pr_old_comment.get_issue_comments.return_value = [
-        Mock(created_at=now - timedelta(days=15))
-    ]
-    mock_pr_no_comments.get_issue_comments.return_value = []
-    
-    # Set up review mocks
-    mock_pr_recent.get_reviews.return_value = []
-    mock_pr_old_comment.get_reviews.return_value = []
-    mock_pr_no_comments.get_reviews.return_value = []
-    
-    # Set up draft status
-    mock_pr_recent.draft = False
-    mock_pr_old_comment.draft = False
-    mock_pr_no_comments.draft = False
+    mock_open_prs(mock_org, [
+        # PR with recent comment (2 days ago)
+        pr_node("Recent Comment PR", now - timedelta(days=10), comments=2, updated_at=now - timedelta(days=2), number=1),
+        # PR with old comment (15 days ago)
+        pr_node("Old Comment PR", now - timedelta(days=20), comments=1, updated_at=now - timedelta(days=15), number=2),
+        # PR with no comments
+        pr_node("No Comments PR", now - timedelta(days=5), comments=0, number=3),
+    ])
+    mock_rest_prs(github_client, {
+        1: rest_pr(now - timedelta(days=10), [now - timedelta(days=2), now - timedelta(days=5)]),
+        2: rest_pr(now - timedelta(days=20), [now - timedelta(days=15)]),
+        3: rest_pr(now - timedelta(days=5)),
+    })
     
     # Test with no-update threshold of 10 days
     reporter = PRReporter(mock_config, verbose=True, no_update_days=10, github_client=github_client)
     stats = reporter.get_repo_stats('repo1')
 
-    print(f"Debug: Total PRs: {stats.total_prs}")
-    print(f"Debug: No update PRs: {stats.no_update_prs}")
-    print(f"Debug: Zero comment PRs: {stats.zero_comment_prs}")
-
     assert stats.total_prs == 3
     assert len(stats.no_update_prs) == 1  # Only one PR with no recent comments (old comment)
     assert stats.no_update_prs[0].title == "Old Comment PR"
@@ -675,23 +672,12 @@ def test_no_update_functionality(mock_config, mock_github, mock_db):
 def test_no_update_functionality_disabled(mock_config, mock_github, mock_db):
     """Test that no-update functionality is disabled when not specified."""
     github_client, mock_org = mock_github
-    mock_repo = Mock()
-    
-    # Create a PR with old comments
     now = datetime.now(timezone.utc)
-    mock_pr = Mock()
-    mock_pr.created_at = now - timedelta(days=20)
-    mock_pr.comments = 3
-    mock_pr.title = "Old Comment PR"
-    mock_pr.html_url = "https://github.com/test-org/repo/pull/1"
-    mock_pr.labels = []
-    mock_pr.get_reviews.return_value = []
-    mock_pr.get_issue_comments.return_value = [
-        Mock(created_at=now - timedelta(days=15))
-    ]
     
-    mock_repo.get_pulls.return_value = [mock_pr]
-    mock_org.get_repo.return_value = mock_repo
+    # A PR with old comments
+    mock_open_prs(mock_org, [
+        pr_node("Old Comment PR", now - timedelta(days=20), comments=3, updated_at=now - timedelta(days=15))
+    ])
     
     # Test without no-update parameter
     reporter = PRReporter(mock_config, verbose=True, github_client=github_client)
@@ -703,21 +689,11 @@ def test_no_update_functionality_disabled(mock_config, mock_github, mock_db):
 def test_no_update_with_exception_handling(mock_config, mock_github, mock_db):
     """Test that no-update functionality handles API exceptions gracefully."""
     github_client, mock_org = mock_github
-    mock_repo = Mock()
-    
-    # Create a PR that will raise an exception when getting comments
     now = datetime.now(timezone.utc)
-    mock_pr = Mock()
-    mock_pr.created_at = now - timedelta(days=10)
-    mock_pr.comments = 2
-    mock_pr.title = "Exception PR"
-    mock_pr.html_url = "https://github.com/test-org/repo/pull/1"
-    mock_pr.labels = []
-    mock_pr.get_reviews.return_value = []
-    mock_pr.get_issue_comments.side_effect = Exception("API Error")
-    
-    mock_repo.get_pulls.return_value = [mock_pr]
-    mock_org.get_repo.return_value = mock_repo
+    
+    # A PR that will raise an exception when getting comments
+    mock_open_prs(mock_org, [pr_node("Exception PR", now - timedelta(days=10), comments=2)])
+    mock_rest_prs(github_client, {1: rest_pr(now - timedelta(days=10), comments_error=Exception("API Error"))})
     
     # Test with no-update parameter - should fall back to PR creation date
     reporter = PRReporter(mock_config, verbose=True, no_update_days=5, github_client=github_client)
@@ -728,6 +704,27 @@ def test_no_update_with_exception_handling(mock_config, mock_github, mock_db):
     assert stats.no_update_prs[0].title == "Exception PR"
     assert stats.no_update_prs[0].last_comment_days == 10  # Should use PR creation date
 
+def test_no_update_survives_failed_pr_fetch(mock_config, mock_github, mock_db):
+    github_client, mock_org = mock_github
+    now = datetime.now(timezone.utc)
+    mock_open_prs(mock_org, [
+        pr_node("Missing PR", now - timedelta(days=10), comments=1, number=1),
+        pr_node("Old Comment PR", now - timedelta(days=20), comments=1, updated_at=now - timedelta(days=15), number=2),
+    ])
+    prs = {2: rest_pr(now - timedelta(days=20), [now - timedelta(days=15)])}
+
+    def get_pull(number):
+        if number not in prs:
+            raise GithubException(404, {'message': 'Not Found'}, {})
+        return prs[number]
+    github_client.get_repo.return_value.get_pull.side_effect = get_pull
+
+    reporter = PRReporter(mock_config, verbose=True, no_update_days=5, github_client=github_client)
+    stats = reporter.get_repo_stats('repo1')
+
+    # Only the PR that couldn't be fetched falls back to its creation date
+    assert {(pr.title, pr.last_comment_days) for pr in stats.no_update_prs} == {("Missing PR", 10), ("Old Comment PR", 15)}
+
 def test_no_update_constructor_parameter(mock_config):
     """Test that the no_update_days parameter is properly passed to the constructor."""
     reporter = PRReporter(mock_config, no_update_days=30)
@@ -753,45 +750,19 @@ def test_no_update_auto_verbose(mock_config):
 def test_no_update_ignore_do_not_merge(mock_config, mock_github, mock_db):
     """Test that PRs with 'DO NOT MERGE' tag are ignored in no-update functionality."""
     github_client, mock_org = mock_github
-    mock_repo = Mock()
-    
-    # Create PRs with different scenarios
     now = datetime.now(timezone.utc)
     
-    # PR with old comments but no DO NOT MERGE tag
-    mock_pr_old = Mock()
-    mock_pr_old.created_at = now - timedelta(days=20)
-    mock_pr_old.comments = 3
-    mock_pr_old.title = "Old Comment PR"
-    mock_pr_old.html_url = "https://github.com/test-org/repo/pull/1"
-    mock_pr_old.labels = []
-    mock_pr_old.get_reviews.return_value = []
-    mock_pr_old.get_issue_comments.return_value = [
-        Mock(created_at=now - timedelta(days=15))
-    ]
-    
-    # PR with old comments AND DO NOT MERGE tag (should be ignored)
-    mock_pr_do_not_merge = Mock()
-    mock_pr_do_not_merge.created_at = now - timedelta(days=20)
-    mock_pr_do_not_merge.comments = 2
-    mock_pr_do_not_merge.title = "DO NOT MERGE PR"
-    mock_pr_do_not_merge.html_url = "https://github.com/test-org/repo/pull/2"
-    mock_pr_do_not_merge.labels = [label_mock("DO NOT MERGE")]
-    mock_pr_do_not_merge.get_reviews.return_value = []
-    mock_pr_do_not_merge.get_issue_comments.return_value = [
-        Mock(created_at=now - timedelta(days=15))
-    ]
-    
-    mock_repo.get_pulls.return_value = [mock_pr_old, mock_pr_do_not_merge]
-    mock_org.get_repo.return_value = mock_repo
-    
-    # Set up updated_at dates for the PRs
-    mock_pr_old.updated_at = now - timedelta(days=15)  # Old push
-    mock_pr_do_not_merge.updated_at = now - timedelta(days=15)  # Old push
-    
-    # Set up draft status
-    mock_pr_old.draft = False
-    mock_pr_do_not_merge.draft = False
+    mock_open_prs(mock_org, [
+        # PR with old comments but no DO NOT MERGE tag
+        pr_node("Old Comment PR", now - timedelta(days=20), comments=3, updated_at=now - timedelta(days=15), number=1),
+        # PR with old comments AND DO NOT MERGE tag (should be ignored)
+        pr_node("DO NOT MERGE PR", now - timedelta(days=20), comments=2, labels=["DO NOT MERGE"],
+                updated_at=now - timedelta(days=15), number=2),
+    ])
+    mock_rest_prs(github_client, {
+        1: rest_pr(now - timedelta(days=20), [now - timedelta(days=15)]),
+        2: rest_pr(now - timedelta(days=20), [now - timedelta(days=15)]),
+    })
     
     # Test with no-update threshold of 10 days
     reporter = PRReporter(mock_config, verbose=True, no_update_days=10, github_client=github_client)
@@ -806,43 +777,18 @@ def test_no_update_ignore_do_not_merge(mock_config, mock_github, mock_db):
 def test_no_update_exclude_recent_pushes(mock_config, mock_github, mock_db):
     """Test that PRs with recent pushes are excluded from no-update functionality."""
     github_client, mock_org = mock_github
-    mock_repo = Mock()
-    
-    # Create PRs with different scenarios
     now = datetime.now(timezone.utc)
     
-    # PR with old comments and old push (should be included)
-    mock_pr_old_all = Mock()
-    mock_pr_old_all.created_at = now - timedelta(days=20)
-    mock_pr_old_all.updated_at = now - timedelta(days=15)  # Old push
-    mock_pr_old_all.comments = 3
-    mock_pr_old_all.title = "Old Comment and Push PR"
-    mock_pr_old_all.html_url = "https://github.com/test-org/repo/pull/1"
-    mock_pr_old_all.labels = []
-    mock_pr_old_all.get_reviews.return_value = []
-    mock_pr_old_all.get_issue_comments.return_value = [
-        Mock(created_at=now - timedelta(days=15))
-    ]
-    
-    # PR with old comments but recent push (should be excluded)
-    mock_pr_recent_push = Mock()
-    mock_pr_recent_push.created_at = now - timedelta(days=20)
-    mock_pr_recent_push.updated_at = now - timedelta(days=3)  # Recent push
-    mock_pr_recent_push.comments = 2
-    mock_pr_recent_push.title = "Recent Push PR"
-    mock_pr_recent_push.html_url = "https://github.com/test-org/repo/pull/2"
-    mock_pr_recent_push.labels = []
-    mock_pr_recent_push.get_reviews.return_value = []
-    mock_pr_recent_push.get_issue_comments.return_value = [
-        Mock(created_at=now - timedelta(days=15))
-    ]
-    
-    mock_repo.get_pulls.return_value = [mock_pr_old_all, mock_pr_recent_push]
-    mock_org.get_repo.return_value = mock_repo
-    
-    # Set up draft status
-    mock_pr_old_all.draft = False
-    mock_pr_recent_push.draft = False
+    mock_open_prs(mock_org, [
+        # PR with old comments and old push (should be included)
+        pr_node("Old Comment and Push PR", now - timedelta(days=20), comments=3, updated_at=now - timedelta(days=15), number=1),
+        # PR with old comments but recent push (should be excluded)
+        pr_node("Recent Push PR", now - timedelta(days=20), comments=2, updated_at=now - timedelta(days=3), number=2),
+    ])
+    mock_rest_prs(github_client, {
+        1: rest_pr(now - timedelta(days=20), [now - timedelta(days=15)]),
+        2: rest_pr(now - timedelta(days=20), [now - timedelta(days=15)]),
+    })
     
     # Test with no-update threshold of 10 days
     reporter = PRReporter(mock_config, verbose=True, no_update_days=10, github_client=github_client)
@@ -852,45 +798,25 @@ def test_no_update_exclude_recent_pushes(mock_config, mock_github, mock_db):
     assert len(stats.no_update_prs) == 1  # Only the PR with old push
     assert stats.no_update_prs[0].title == "Old Comment and Push PR"
     assert "Recent Push" not in [pr.title for pr in stats.no_update_prs] 
+    # Comments are only fetched for PRs that have been idle long enough
+    github_client.get_repo.assert_called_once_with('test-org/repo1', lazy=True)
+    github_client.get_repo.return_value.get_pull.assert_called_once_with(1)
 
 def test_no_update_draft_prs(mock_config, mock_github, mock_db):
     """Test that draft PRs are correctly identified and can be displayed in yellow."""
     github_client, mock_org = mock_github
-    mock_repo = Mock()
-    
-    # Create PRs with different scenarios
     now = datetime.now(timezone.utc)
     
-    # Regular PR with old comments and push
-    mock_pr_regular = Mock()
-    mock_pr_regular.created_at = now - timedelta(days=20)
-    mock_pr_regular.updated_at = now - timedelta(days=15)  # Old push
-    mock_pr_regular.comments = 3
-    mock_pr_regular.title = "Regular PR"
-    mock_pr_regular.html_url = "https://github.com/test-org/repo/pull/1"
-    mock_pr_regular.labels = []
-    mock_pr_regular.draft = False
-    mock_pr_regular.get_reviews.return_value = []
-    mock_pr_regular.get_issue_comments.return_value = [
-        Mock(created_at=now - timedelta(days=15))
-    ]
-    
-    # Draft PR with old comments and push
-    mock_pr_draft = Mock()
-    mock_pr_draft.created_at = now - timedelta(days=20)
-    mock_pr_draft.updated_at = now - timedelta(days=15)  # Old push
-    mock_pr_draft.comments = 2
-    mock_pr_draft.title = "Draft PR"
-    mock_pr_draft.html_url = "https://github.com/test-org/repo/pull/2"
-    mock_pr_draft.labels = []
-    mock_pr_draft.draft = True
-    mock_pr_draft.get_reviews.return_value = []
-    mock_pr_draft.get_issue_comments.return_value = [
-        Mock(created_at=now - timedelta(days=15))
-    ]
-    
-    mock_repo.get_pulls.return_value = [mock_pr_regular, mock_pr_draft]
-    mock_org.get_repo.return_value = mock_repo
+    mock_open_prs(mock_org, [
+        # Regular PR with old comments and push
+        pr_node("Regular PR", now - timedelta(days=20), comments=3, updated_at=now - timedelta(days=15), number=1),
+        # Draft PR with old comments and push
+        pr_node("Draft PR", now - timedelta(days=20), comments=2, updated_at=now - timedelta(days=15), is_draft=True, number=2),
+    ])
+    mock_rest_prs(github_client, {
+        1: rest_pr(now - timedelta(days=20), [now - timedelta(days=15)]),
+        2: rest_pr(now - timedelta(days=20), [now - timedelta(days=15)]),
+    })
     
     # Test with no-update threshold of 10 days
     reporter = PRReporter(mock_config, verbose=True, no_update_days=10, github_client=github_client)
@@ -904,4 +830,4 @@ def test_no_update_draft_prs(mock_config, mock_github, mock_db):
     regular_pr = next(pr for pr in stats.no_update_prs if pr.title == "Regular PR")
     
     assert draft_pr.is_draft == True
-    assert regular_pr.is_draft == False 
\ No newline at end of file
+    assert regular_pr.is_draft == False